@@ -0,0 +1,97 @@
+"""Benchmarks on a generated input.
+
+- Calibration engine against the original chain of str.replace
+- Scaling of the parallel solver from 1 to N worker processes
+"""
+
+from typing import *
+import argparse
+import os
+import random
+import re
+import tempfile
+import time
+
+from day1 import PART_TWO_ENGINE, SPELLED_DIGITS, solve, solve_parallel
+
+
+def replace_chain_value(line: str) -> int:
+    """Original part two implementation, kept as reference."""
+    s_value: str = (
+        line.strip()
+        .replace("oneight", "18")
+        .replace("twone", "21")
+        .replace("threeight", "38")
+        .replace("fiveight", "58")
+        .replace("sevenine", "79")
+        .replace("eightwo", "82")
+        .replace("eighthree", "82")
+        .replace("nineight", "98")
+        .replace("one", "1")
+        .replace("two", "2")
+        .replace("three", "3")
+        .replace("four", "4")
+        .replace("five", "5")
+        .replace("six", "6")
+        .replace("seven", "7")
+        .replace("eight", "8")
+        .replace("nine", "9")
+    )
+    s_value = re.sub(r'[^0-9]+', "", s_value)
+    return int(f"{s_value[0]}{s_value[-1]}")
+
+
+def generate_lines(line_number: int, seed: int = 2023) -> List[str]:
+    """Generate lines looking like the puzzle input (always containing at least one written digit)."""
+    rng: random.Random = random.Random(seed)
+    tokens: List[str] = list(SPELLED_DIGITS) + list("123456789") + list("abcdefghijklmnopqrstuvwxyz")
+
+    lines: List[str] = []
+    for _ in range(line_number):
+        parts: List[str] = rng.choices(tokens, k=rng.randint(2, 10))
+        parts.insert(rng.randint(0, len(parts)), str(rng.randint(1, 9)))
+        lines.append("".join(parts))
+    return lines
+
+
+def timed(name: str, function: Callable[[str], int], lines: List[str]) -> int:
+    start: float = time.perf_counter()
+    result: int = sum(function(line) for line in lines)
+    elapsed: float = time.perf_counter() - start
+    print(f"{name:<20} {elapsed:8.3f}s  ({len(lines) / elapsed:,.0f} lines/s)  total={result}")
+    return result
+
+
+def benchmark_scaling(lines: List[str], max_workers: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path: str = os.path.join(tmp_dir, "input.txt")
+        with open(path, mode='w') as f_output:
+            f_output.writelines(f"{line}\n" for line in lines)
+
+        start: float = time.perf_counter()
+        solve(path)
+        reference: float = time.perf_counter() - start
+        print(f"{'streaming':<20} {reference:8.3f}s")
+
+        for workers in range(1, max_workers + 1):
+            start = time.perf_counter()
+            solve_parallel(path, workers)
+            elapsed: float = time.perf_counter() - start
+            print(f"{f'{workers} worker(s)':<20} {elapsed:8.3f}s  (speedup x{reference / elapsed:.2f})")
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=2_000_000, help="Number of generated lines")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args: argparse.Namespace = parser.parse_args()
+
+    print(f"Generating {args.lines:,} lines...")
+    lines: List[str] = generate_lines(args.lines)
+
+    print("\n== Calibration engine ==")
+    timed("replace chain", replace_chain_value, lines)
+    timed("automaton", PART_TWO_ENGINE.get_value, lines)
+
+    print("\n== Parallel scaling ==")
+    benchmark_scaling(lines, args.max_workers)
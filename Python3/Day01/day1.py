@@ -1,57 +1,211 @@
-import re
-
-
-def part_one() -> int:
-    total_sum: int = 0
-
-    with open("input.txt", mode='r') as f_input:
-        for line in f_input.readlines():
-            # Remove all none-digit characters
-            s_value: str = re.sub(r'[^0-9]+', "", line).strip()
-            # Looking for 2-digit long integer so keeping only first and last ones
-            s_value = f"{s_value[0]}{s_value[-1]}"
-            # Make it an int
-            i_value: int = int(s_value)
-            total_sum += i_value
-
-    return total_sum
-
-
-def part_two() -> int:
-    total_sum: int = 0
-
-    with open("input.txt", mode='r') as f_input:
-        for line in f_input.readlines():
-            # The trick here is letter-written digits sharing a letter.
-            # I basically wrote them all
-            # And I assume it won't happen with 3 digits...
-            s_value: str = (
-                line.strip()
-                .replace("oneight", "18")
-                .replace("twone", "21")
-                .replace("threeight", "38")
-                .replace("fiveight", "58")
-                .replace("sevenine", "79")
-                .replace("eightwo", "82")
-                .replace("eighthree", "82")
-                .replace("nineight", "98")
-                .replace("one", "1")
-                .replace("two", "2")
-                .replace("three", "3")
-                .replace("four", "4")
-                .replace("five", "5")
-                .replace("six", "6")
-                .replace("seven", "7")
-                .replace("eight", "8")
-                .replace("nine", "9")
-            )
-
-            s_value = re.sub(r'[^0-9]+', "", s_value)
-            s_value = f"{s_value[0]}{s_value[-1]}"
-
-            i_value: int = int(s_value)
-            total_sum += i_value
-    return total_sum
-
-print(part_one())
-print(part_two())
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import *
+import argparse
+import mmap
+import os
+
+
+DIGITS: Dict[str, int] = {str(digit): digit for digit in range(10)}
+
+SPELLED_DIGITS: Dict[str, int] = {
+    "one": 1,
+    "two": 2,
+    "three": 3,
+    "four": 4,
+    "five": 5,
+    "six": 6,
+    "seven": 7,
+    "eight": 8,
+    "nine": 9,
+}
+
+
+class DigitMatcher:
+    """Aho-Corasick automaton recognizing digits (written or spelled) in a stream of characters.
+
+    The automaton is compiled into a full transition table, so reading a character is a single lookup.
+    No word is contained in another one, thus the first completed word is also the first started one.
+    """
+
+    transitions: List[Dict[str, int]]
+    outputs: List[Optional[int]]  # Digit recognized when reaching each state
+
+    def __init__(self, words: Dict[str, int]) -> None:
+        self.transitions = [{}]
+        self.outputs = [None]
+
+        # Build the trie
+        for word, digit in words.items():
+            state: int = 0
+            for char in word:
+                if char not in self.transitions[state]:
+                    self.transitions.append({})
+                    self.outputs.append(None)
+                    self.transitions[state][char] = len(self.transitions) - 1
+                state = self.transitions[state][char]
+            self.outputs[state] = digit
+
+        # Compute failure links breadth first, completing the transitions on the fly
+        alphabet: Set[str] = {char for word in words for char in word}
+        fail: List[int] = [0] * len(self.transitions)
+        queue: Deque[int] = deque(self.transitions[0].values())
+
+        while queue:
+            state = queue.popleft()
+            if self.outputs[state] is None:
+                self.outputs[state] = self.outputs[fail[state]]
+
+            for char in alphabet:
+                if char in self.transitions[state]:
+                    child: int = self.transitions[state][char]
+                    fail[child] = self.transitions[fail[state]].get(char, 0)
+                    queue.append(child)
+                else:
+                    fallback: int = self.transitions[fail[state]].get(char, 0)
+                    if fallback != 0:
+                        self.transitions[state][char] = fallback
+
+    def find_first(self, chars: Iterable[str]) -> Optional[int]:
+        """Return the first digit found while reading the characters, if any."""
+        transitions: List[Dict[str, int]] = self.transitions
+        outputs: List[Optional[int]] = self.outputs
+
+        state: int = 0
+        for char in chars:
+            state = transitions[state].get(char, 0)
+            if outputs[state] is not None:
+                return outputs[state]
+        return None
+
+
+class CalibrationEngine:
+    """Extract calibration values, reading each line from both ends until a digit is found."""
+
+    forward: DigitMatcher
+    backward: DigitMatcher
+
+    def __init__(self, words: Dict[str, int]) -> None:
+        self.forward = DigitMatcher(words)
+        self.backward = DigitMatcher({word[::-1]: digit for word, digit in words.items()})
+
+    def get_value(self, line: str) -> int:
+        first: Optional[int] = self.forward.find_first(line)
+        last: Optional[int] = self.backward.find_first(reversed(line))
+
+        if first is None or last is None:
+            raise ValueError(f"No digit found in line {line!r}")
+        return 10 * first + last
+
+
+PART_ONE_ENGINE: CalibrationEngine = CalibrationEngine(DIGITS)
+PART_TWO_ENGINE: CalibrationEngine = CalibrationEngine({**DIGITS, **SPELLED_DIGITS})
+
+CHUNK_SIZE: int = 1 << 20  # 1 MiB
+
+
+def read_chunks(f_input: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Read a binary file by fixed-size chunks."""
+    while chunk := f_input.read(chunk_size):
+        yield chunk
+
+
+def split_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Rebuild the lines from consecutive chunks, only keeping the incomplete last one in memory."""
+    remainder: bytes = b""
+    for chunk in chunks:
+        lines: List[bytes] = (remainder + chunk).split(b"\n")
+        remainder = lines.pop()
+        for line in lines:
+            yield line.decode()
+    if remainder:
+        yield remainder.decode()
+
+
+def sum_calibration_values(lines: Iterable[str]) -> Tuple[int, int]:
+    """Compute both parts' totals in a single pass over the lines."""
+    total_one: int = 0
+    total_two: int = 0
+
+    for line in lines:
+        line = line.strip()
+
+        # Ignore empty lines
+        if not line:
+            continue
+
+        total_one += PART_ONE_ENGINE.get_value(line)
+        # Spelled digits may share letters ("oneight", "eighthree"),
+        # the automaton handles it since it never consumes a matched word
+        total_two += PART_TWO_ENGINE.get_value(line)
+
+    return total_one, total_two
+
+
+def solve(path: str, chunk_size: int = CHUNK_SIZE) -> Tuple[int, int]:
+    """Stream the file once, memory usage is bounded by the chunk size (and the longest line)."""
+    with open(path, mode='rb') as f_input:
+        return sum_calibration_values(split_lines(read_chunks(f_input, chunk_size)))
+
+
+# Parallel resolution
+
+def split_file(path: str, parts: int) -> List[Tuple[int, int]]:
+    """Split the file into at most `parts` byte ranges, each of them ending on a line end."""
+    size: int = os.path.getsize(path)
+    if size == 0:
+        return []
+
+    bounds: List[int] = [0]
+    with open(path, mode='rb') as f_input, mmap.mmap(f_input.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for idx in range(1, parts):
+            newline: int = mapped.find(b"\n", max(bounds[-1], size * idx // parts))
+            if newline == -1:
+                break
+            bounds.append(newline + 1)
+    bounds.append(size)
+
+    return [(start, end) for start, end in zip(bounds[:-1], bounds[1:]) if start < end]
+
+
+def map_chunks(mapped: mmap.mmap, start: int, end: int, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Read a range of a memory-mapped file by fixed-size chunks."""
+    for offset in range(start, end, chunk_size):
+        yield mapped[offset:min(offset + chunk_size, end)]
+
+
+def solve_range(path: str, start: int, end: int) -> Tuple[int, int]:
+    """Compute both parts' totals of a byte range, reading the file directly through mmap."""
+    with open(path, mode='rb') as f_input, mmap.mmap(f_input.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return sum_calibration_values(split_lines(map_chunks(mapped, start, end)))
+
+
+def solve_parallel(path: str, workers: int) -> Tuple[int, int]:
+    """Sum each range of the file in its own process, then reduce the partial totals."""
+    ranges: List[Tuple[int, int]] = split_file(path, workers)
+    if not ranges:
+        return 0, 0
+
+    starts, ends = zip(*ranges)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        partial_totals: List[Tuple[int, int]] = list(executor.map(solve_range, repeat(path), starts, ends))
+
+    return sum(total[0] for total in partial_totals), sum(total[1] for total in partial_totals)
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument("input", nargs="?", default="input.txt")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes")
+    args: argparse.Namespace = parser.parse_args()
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    if args.workers == 1:
+        part_one, part_two = solve(args.input)
+    else:
+        part_one, part_two = solve_parallel(args.input, args.workers)
+    print(part_one)
+    print(part_two)
@@ -1,8 +1,9 @@
 from enum import Enum
-from math import prod
 from typing import *
 import re
 
+import numpy as np
+
 class Color(Enum):
     RED = "red"
     GREEN = "green"
@@ -16,90 +17,83 @@ MAXIMA_ONE: Dict[Color, int] = {
 
 # Regexes
 game_re = re.compile(r"Game (\d+)")
+cubes_re = re.compile(r"(\d+) (red|green|blue)")
 
-color_regexes = {
-    color: re.compile(fr"(\d+) {color.value}")
-    for color in Color
-}
 
-def extract_value(string: str, regex: Pattern[str]) -> int:
-    match: Optional[Match[str]] = regex.search(string)
-    if match is not None:
-        return int(match.group(1))
-    return 0
+class GameTable:
+    """Columnar representation of the games: one row per game, one column per color (in Color order)."""
+
+    ids: np.ndarray  # (n_games,) int32
+    maxima: np.ndarray  # (n_games, 3) int32, maximum number of cubes shown
+
+    def __init__(self, ids: List[int], maxima: List[List[int]]) -> None:
+        self.ids = np.array(ids, dtype=np.int32)
+        self.maxima = np.array(maxima, dtype=np.int32).reshape(len(ids), len(Color))
+
+    @staticmethod
+    def to_limits(maxima: Dict[Color, int]) -> np.ndarray:
+        """Colors missing from the maxima are not limited."""
+        return np.array([maxima.get(color, np.iinfo(np.int32).max) for color in Color], dtype=np.int32)
+
+    def possible_games(self, maxima: Dict[Color, int]) -> np.ndarray:
+        return (self.maxima <= self.to_limits(maxima)).all(axis=1)
 
-def is_possible_game(game: Dict[Color, int], maxima: Dict[Color, int]) -> bool:
-    return all(
-        game.get(color, 0) <= max
-        for color, max in maxima.items()
-    )
+    def sum_possible_ids(self, maxima: Dict[Color, int]) -> int:
+        return int(self.ids.sum(where=self.possible_games(maxima), dtype=np.int64))
 
-def compute_game_power(game: Dict[Color, int]) -> int:
-    return prod(game.values())
+    def sum_possible_ids_many(self, queries: Sequence[Dict[Color, int]]) -> np.ndarray:
+        """Answer several maxima queries at once, returning one sum per query.
 
+        Allocates a (n_queries, n_games, 3) boolean array, split the queries if it is too large.
+        """
+        limits: np.ndarray = np.array([self.to_limits(maxima) for maxima in queries], dtype=np.int32).reshape(-1, len(Color))
+        possible: np.ndarray = (self.maxima[np.newaxis, :, :] <= limits[:, np.newaxis, :]).all(axis=2)
+        return possible @ self.ids.astype(np.int64)
 
-def part_one() -> int:
-    games_results = {}
-    with open("input.txt", mode="r") as f_input:
-        for line in f_input.readlines():
-            game_line, rounds_line = line.split(":", maxsplit=1)
+    def power_sum(self) -> int:
+        return int(self.maxima.prod(axis=1, dtype=np.int64).sum())
 
-            # Get game ID
-            match: Optional[Match[str]] = game_re.search(game_line)
-            if match is None:
-                raise ValueError(game_line)
-            game_id: int = int(match.group(1))
 
-            # Initialize game_results
-            tmp_results = {color: 0 for color in Color}
+def parse_games(lines: Iterable[str]) -> GameTable:
+    """Compute the maximum number of cubes of each color shown in each game.
 
-            # Iterate on rounds
-            for g_round in rounds_line.split(";"):
+    Rounds do not matter here, a single scan of the line is enough.
+    """
+    ids: List[int] = []
+    maxima: List[List[int]] = []
+    color_columns: Dict[str, int] = {color.value: idx for idx, color in enumerate(Color)}
 
-                # Look for each color
-                for color in Color:
-                    tmp_results[color] = max(tmp_results[color], extract_value(g_round, color_regexes[color]))
+    for line in lines:
+        game_line, _separator, rounds_line = line.partition(":")
 
-            # Finaly, add it to results
-            games_results[game_id] = tmp_results
+        # Get game ID
+        match: Optional[Match[str]] = game_re.search(game_line)
+        if match is None:
+            raise ValueError(game_line)
+        ids.append(int(match.group(1)))
 
-    # Compute possible games
-    result: int = sum(
-        id for id, game in games_results.items() if is_possible_game(game, MAXIMA_ONE)
-    )
-    return result
+        # Keep the maximum of each color over all rounds
+        tmp_results: List[int] = [0] * len(Color)
+        for cubes_match in cubes_re.finditer(rounds_line):
+            column: int = color_columns[cubes_match.group(2)]
+            tmp_results[column] = max(tmp_results[column], int(cubes_match.group(1)))
 
+        maxima.append(tmp_results)
 
-def part_two() -> int:
-    games_results = {}
-    with open("input.txt", mode="r") as f_input:
-        for line in f_input.readlines():
-            game_line, rounds_line = line.split(":", maxsplit=1)
+    return GameTable(ids, maxima)
 
-            # Get game ID
-            match: Optional[Match[str]] = game_re.search(game_line)
-            if match is None:
-                raise ValueError(game_line)
-            game_id: int = int(match.group(1))
 
-            # Initialize game_results
-            tmp_results = {color: 0 for color in Color}
+games: GameTable
+with open("input.txt", mode="r") as f_input:
+    games = parse_games(f_input)
 
-            # Iterate on rounds
-            for g_round in rounds_line.split(";"):
 
-                # Look for each color
-                for color in Color:
-                    tmp_results[color] = max(tmp_results[color], extract_value(g_round, color_regexes[color]))
+def part_one(games: GameTable) -> int:
+    return games.sum_possible_ids(MAXIMA_ONE)
 
-            # Finaly, add it to results
-            games_results[game_id] = tmp_results
 
-    # Compute possible games power
-    result: int = sum(
-        compute_game_power(game) for _, game in games_results.items()
-    )
-    return result
+def part_two(games: GameTable) -> int:
+    return games.power_sum()
 
-print(part_one())
-print(part_two())
+print(part_one(games))
+print(part_two(games))
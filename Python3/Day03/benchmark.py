@@ -0,0 +1,37 @@
+"""Time both schematic backends on generated square schematics."""
+
+from typing import *
+import argparse
+import random
+import time
+
+from day3 import ArraySchematic, Schematic, part_one, part_two
+
+
+def generate_lines(size: int, seed: int = 2023) -> List[str]:
+    """Generate a size x size schematic: mostly dots, some digits and a few symbols."""
+    rng: random.Random = random.Random(seed)
+    # Map each random byte to a cell, following the wanted distribution
+    table: bytes = (b"." * 166 + b"0123456789" * 8 + b"*#+$/@=%&-")[:256]
+    return [rng.randbytes(size).translate(table).decode() for _ in range(size)]
+
+
+def timed(name: str, function: Callable[[], Any]) -> Any:
+    start: float = time.perf_counter()
+    result: Any = function()
+    print(f"{name:<20} {time.perf_counter() - start:8.3f}s")
+    return result
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000], help="Schematics side lengths")
+    args: argparse.Namespace = parser.parse_args()
+
+    for size in args.sizes:
+        print(f"== {size} x {size} ==")
+        lines: List[str] = generate_lines(size)
+        for backend in (Schematic, ArraySchematic):
+            schematic: Union[Schematic, ArraySchematic] = timed(f"{backend.__name__}", lambda: backend(lines))
+            timed("  part one", lambda: part_one(schematic))
+            timed("  part two", lambda: part_two(schematic))
@@ -1,10 +1,16 @@
-from collections import defaultdict
-from typing import DefaultDict, List, Optional, Pattern, Tuple
+from array import array
+from typing import List, Optional, Pattern, Set, Tuple, Union
+import argparse
 import re
 
+import numpy as np
+
 DIGITS_REGEX: Pattern[str] = re.compile("[0-9]+")
 SYMBOL_REGEX: Pattern[str] = re.compile("[^0-9.]")
 
+INT64_MAX: int = int(np.iinfo(np.int64).max)
+INT64_MAX_DIGITS: int = len(str(INT64_MAX)) - 1  # Any number with that many digits fits
+
 
 class Schematic:
 
@@ -12,118 +18,210 @@ class Schematic:
     max_row: int
     max_col: int
 
+    # Index built in one pass over the lines
+    numbers: List[int]  # Value of each number, by ID (one ID per digits span)
+    number_ids: List[array]  # For each row, ID of the number written on each cell (-1 if none)
+    symbols: List[Tuple[int, int]]
+
     def __init__(self, lines: List[str]) -> None:
         self.lines = [line.strip() for line in lines]
         self.max_row = len(self.lines)
         self.max_col = len(self.lines[0])
+        self.build_index()
+
+    def build_index(self) -> None:
+        self.numbers = []
+        self.number_ids = []
+        self.symbols = []
+
+        empty_row: array = array('i', [-1]) * self.max_col
+        for row, line in enumerate(self.lines):
+            row_ids: array = array('i', empty_row)
+
+            for num_match in DIGITS_REGEX.finditer(line):
+                start, end = num_match.span()
+                row_ids[start:end] = array('i', [len(self.numbers)]) * (end - start)
+                self.numbers.append(int(num_match.group()))
+
+            for symbol_match in SYMBOL_REGEX.finditer(line):
+                self.symbols.append((row, symbol_match.start()))
+
+            self.number_ids.append(row_ids)
 
     def get_symbols_coordinates(self) -> List[Tuple[int, int]]:
-        results: List[Tuple[int, int]] = []
-        for row in range(self.max_row):
-            for col in range(self.max_col):
-                val = self.get_char(row, col)
-
-                if val is None:
-                    continue
-
-                if SYMBOL_REGEX.fullmatch(val):
-                    results.append((row, col))
-
-        return results
-
-    def get_adjacent_coordinates(self, row: int, col: int) -> List[Tuple[int, int]]:
-        full_list: List[Tuple[int, int]] = [
-            (row-1, col-1), # Upper left
-            (row-1, col),   # Upper
-            (row-1, col+1), # Upper right
-            (row, col-1),   # Left
-            (row, col+1),   # Right
-            (row+1, col-1), # Lower left
-            (row+1, col),   # Lower
-            (row+1, col+1), # Lower
-        ]
-        return [coord for coord in full_list if self.get_char(*coord) is not None]
+        return self.symbols
+
+    def get_adjacent_number_ids(self, row: int, col: int) -> Set[int]:
+        """Return the IDs of all numbers next to a cell, each number being found only once.
+
+        Ex:
+        .123.  # 123 is 3 times next to the gear but has only one ID
+        ..*..
+        .....
+        """
+        result: Set[int] = set()
+        for adj_row in range(max(row - 1, 0), min(row + 2, self.max_row)):
+            row_ids: array = self.number_ids[adj_row]
+            for adj_col in range(max(col - 1, 0), min(col + 2, self.max_col)):
+                if row_ids[adj_col] != -1:
+                    result.add(row_ids[adj_col])
+        return result
 
     def get_char(self, row: int, col: int) -> Optional[str]:
         if not (0 <= row < self.max_row) or not (0 <= col < self.max_col):  # pylint: disable=superfluous-parens
             return None
         return self.lines[row][col]
 
+    def part_numbers_sum(self) -> int:
+        # Set of all numbers found next to a symbol, to prevent adding multiple times the same value
+        part_number_ids: Set[int] = set()
 
-# Execution
+        for symb_x, symb_y in self.get_symbols_coordinates():
+            part_number_ids.update(self.get_adjacent_number_ids(symb_x, symb_y))
 
-schematic: Schematic
+        return sum(self.numbers[number_id] for number_id in part_number_ids)
 
-with open("../input.txt", mode='r') as f_input:
-    schematic = Schematic(f_input.readlines())
+    def gear_ratios_sum(self) -> int:
+        result: int = 0
 
+        for symb_x, symb_y in self.get_symbols_coordinates():
 
-def part_one(schematic: Schematic) -> int:
-    result: int = 0
+            if self.get_char(symb_x, symb_y) != "*":
+                continue
 
-    for symb_x, symb_y in schematic.get_symbols_coordinates():
+            gear_number_ids: List[int] = list(self.get_adjacent_number_ids(symb_x, symb_y))
 
-        # Dict of all found numbers y-position range, to prevent adding multiple times the same value
-        # Ex:
-        # .123.  # 123 is 3 times next to the gear but should be added only once
-        # ..*..
-        # .....
-        added_ranges: DefaultDict[int, List[Tuple[int, int]]] = defaultdict(list)
+            if len(gear_number_ids) == 2:
+                result += self.numbers[gear_number_ids[0]] * self.numbers[gear_number_ids[1]]
+        return result
 
-        for adj_x, adj_y in schematic.get_adjacent_coordinates(symb_x, symb_y):
-            char: Optional[str] = schematic.get_char(adj_x, adj_y)
-            if char is None:
-                continue
-            if SYMBOL_REGEX.fullmatch(char):
-                continue
 
-            # Find all numbers in this line
-            for num_match in DIGITS_REGEX.finditer(schematic.lines[adj_x]):
-                # Find the only one that include the 'y' coordinate
-                if adj_y in range(*num_match.span()):
-                    # Do not add already added files
-                    if num_match.span() in added_ranges[adj_x]:
-                        continue
+class ArraySchematic:
+    """Alternative backend, working on the whole grid with NumPy array operations."""
 
-                    result += int(num_match.group())
-                    added_ranges[adj_x].append(num_match.span())
-    return result
+    grid: np.ndarray  # (max_row, max_col) uint8, one ASCII code per cell
+    max_row: int
+    max_col: int
 
+    labels: np.ndarray  # (max_row, max_col), ID of the number written on each cell, 0 if none
+    # Value of each number, indexed by ID (numbers[0] = 0 stands for "no number"),
+    # as int64 or as Python integers (object) if some numbers are too long
+    numbers: np.ndarray
 
-def part_two(schematic: Schematic) -> int:
-    result: int = 0
+    def __init__(self, lines: List[str]) -> None:
+        stripped_lines: List[str] = [line.strip() for line in lines]
+        self.max_row = len(stripped_lines)
+        self.max_col = len(stripped_lines[0])
+        self.grid = np.frombuffer("".join(stripped_lines).encode(), dtype=np.uint8).reshape(self.max_row, self.max_col)
+        self.label_numbers()
+
+    def get_digit_mask(self) -> np.ndarray:
+        return (ord("0") <= self.grid) & (self.grid <= ord("9"))
+
+    def get_symbol_mask(self) -> np.ndarray:
+        return ~self.get_digit_mask() & (self.grid != ord("."))
+
+    def label_numbers(self) -> None:
+        # Flatten the grid with an extra non-digit column, so that numbers never span two rows
+        digits: np.ndarray = np.full((self.max_row, self.max_col + 1), -1, dtype=np.int8)
+        digits[:, :-1] = np.where(self.get_digit_mask(), self.grid - ord("0"), -1)
+        flat_digits: np.ndarray = digits.ravel()
+        is_digit: np.ndarray = flat_digits >= 0
+
+        # Digit runs boundaries
+        previous_is_digit: np.ndarray = np.concatenate(([False], is_digit[:-1]))
+        next_is_digit: np.ndarray = np.concatenate((is_digit[1:], [False]))
+        run_starts: np.ndarray = is_digit & ~previous_is_digit
+        run_ends: np.ndarray = np.flatnonzero(is_digit & ~next_is_digit)
+
+        flat_labels: np.ndarray = np.where(is_digit, np.cumsum(run_starts, dtype=np.int32), 0)
+        self.labels = flat_labels.reshape(self.max_row, self.max_col + 1)[:, :-1]
+
+        # Value of each number: sum of its digits weighted by their power of ten
+        digit_positions: np.ndarray = np.flatnonzero(is_digit)
+        self.numbers = np.zeros(len(run_ends) + 1, dtype=np.int64)
+        if len(digit_positions) == 0:
+            return
+
+        run_start_positions: np.ndarray = np.flatnonzero(run_starts)
+        if (run_ends - run_start_positions).max() >= INT64_MAX_DIGITS:
+            # Too long for int64, parse each number exactly
+            raw: bytes = np.where(is_digit, flat_digits + ord("0"), ord(".")).astype(np.uint8).tobytes()
+            self.numbers = np.array(
+                [0] + [int(raw[start:end + 1]) for start, end in zip(run_start_positions.tolist(), run_ends.tolist())],
+                dtype=object,
+            )
+            return
+
+        digit_labels: np.ndarray = flat_labels[digit_positions]
+        powers: np.ndarray = run_ends[digit_labels - 1] - digit_positions
+        weighted_digits: np.ndarray = flat_digits[digit_positions].astype(np.int64) * np.power(10, powers, dtype=np.int64)
+        self.numbers[1:] = np.add.reduceat(weighted_digits, np.flatnonzero(run_starts[digit_positions]))
+
+    def get_exact_numbers(self, bound: int) -> np.ndarray:
+        """Numbers, as Python integers (object) if computations on them may go up to the bound."""
+        if self.numbers.dtype != object and INT64_MAX < bound:
+            return self.numbers.astype(object)
+        return self.numbers
+
+    def get_neighbourhood_labels(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """Return the labels of the 3x3 neighbourhood of each given cell, as a (n_cells, 9) array."""
+        padded_labels: np.ndarray = np.pad(self.labels, 1)
+        return np.stack(
+            [
+                padded_labels[rows + 1 + d_row, cols + 1 + d_col]
+                for d_row in (-1, 0, 1)
+                for d_col in (-1, 0, 1)
+            ],
+            axis=1,
+        )
+
+    def part_numbers_sum(self) -> int:
+        # Dilate the symbols with a 3x3 kernel (logical OR of the 9 shifted masks)
+        padded_symbols: np.ndarray = np.pad(self.get_symbol_mask(), 1)
+        dilated: np.ndarray = np.zeros((self.max_row, self.max_col), dtype=bool)
+        for d_row in range(3):
+            for d_col in range(3):
+                dilated |= padded_symbols[d_row:d_row + self.max_row, d_col:d_col + self.max_col]
+
+        # Numbers touching the dilated mask, each one counted once
+        part_number_ids: np.ndarray = np.unique(self.labels[dilated])
+        numbers: np.ndarray = self.get_exact_numbers(int(self.numbers.max()) * len(part_number_ids))
+        return int(numbers[part_number_ids].sum())
+
+    def gear_ratios_sum(self) -> int:
+        rows, cols = np.nonzero(self.grid == ord("*"))
+        neighbours: np.ndarray = np.sort(self.get_neighbourhood_labels(rows, cols), axis=1)
+
+        # Keep each adjacent number once
+        distinct: np.ndarray = neighbours != 0
+        distinct[:, 1:] &= neighbours[:, 1:] != neighbours[:, :-1]
+
+        gears: np.ndarray = distinct.sum(axis=1) == 2
+        numbers: np.ndarray = self.get_exact_numbers(int(self.numbers.max()) ** 2 * len(gears))
+        ratios: np.ndarray = np.where(distinct, numbers[neighbours], 1).prod(axis=1)
+        return int(ratios[gears].sum())
 
-    for symb_x, symb_y in schematic.get_symbols_coordinates():
 
-        if schematic.get_char(symb_x, symb_y) != "*":
-            continue
+# Execution
 
-        added_ranges: DefaultDict[int, List[Tuple[int, int]]] = defaultdict(list)
-        gear_numbers: List[int] = []  # Remember values found around the current gear
+def part_one(schematic: Union[Schematic, ArraySchematic]) -> int:
+    return schematic.part_numbers_sum()
 
-        for adj_x, adj_y in schematic.get_adjacent_coordinates(symb_x, symb_y):
-            char: Optional[str] = schematic.get_char(adj_x, adj_y)
-            if char is None:
-                continue
-            if SYMBOL_REGEX.fullmatch(char):
-                continue
 
-            # Find all numbers in this line
-            for num_match in DIGITS_REGEX.finditer(schematic.lines[adj_x]):
-                # Find the only one that include the 'y' coordinate
-                if adj_y in range(*num_match.span()):
-                    # Do not add already added files
-                    if num_match.span() in added_ranges[adj_x]:
-                        continue
+def part_two(schematic: Union[Schematic, ArraySchematic]) -> int:
+    return schematic.gear_ratios_sum()
+
 
-                    # print(f"Adding: {num_match.group()} ({adj_x};{adj_y})")
-                    gear_numbers.append( int(num_match.group()) )
-                    added_ranges[adj_x].append(num_match.span())
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument("--numpy", action="store_true", help="Use the NumPy backend")
+    args: argparse.Namespace = parser.parse_args()
 
-        if len(gear_numbers) == 2:
-            result += gear_numbers[0] * gear_numbers[1]
-    return result
+    schematic: Union[Schematic, ArraySchematic]
 
+    with open("../input.txt", mode='r') as f_input:
+        schematic = ArraySchematic(f_input.readlines()) if args.numpy else Schematic(f_input.readlines())
 
-print("Part one:", part_one(schematic))
-print("Part two:", part_two(schematic))
+    print("Part one:", part_one(schematic))
+    print("Part two:", part_two(schematic))
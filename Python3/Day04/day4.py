@@ -1,50 +1,88 @@
-from collections import defaultdict
 from typing import *
 
 
-def part_one() -> int:
-    result: int = 0
+def to_bitmask(numbers_str: str) -> int:
+    """Encode numbers (below 100) as the bits of an integer."""
+    mask: int = 0
+    for number in numbers_str.split():
+        mask |= 1 << int(number)
+    return mask
 
-    with open("input.txt", mode="r") as f_input:
-        for line in f_input.readlines():
-            _game, _separator, values = line.strip().partition(":")
-            winning_numbers_str, _separator, my_numbers_str = values.partition("|")
 
-            # From string to int
-            winning_numbers: Set[int] = {int(x) for x in winning_numbers_str.strip().split(" ") if x != ""}
-            my_numbers: Set[int] = {[int(x) for x in my_numbers_str.strip().split(" ") if x != ""]}
+def count_matches(line: str) -> int:
+    _game, _separator, values = line.strip().partition(":")
+    winning_numbers_str, _separator, my_numbers_str = values.partition("|")
 
-            # Find all common numbers
-            common_numbers = winning_numbers.intersection(my_numbers)
-            if common_numbers:
-                result += pow(2, len(common_numbers) - 1)
+    # Common numbers are the bits set in both masks
+    return (to_bitmask(winning_numbers_str) & to_bitmask(my_numbers_str)).bit_count()
 
-    return result
 
+class CopyPropagator:
+    """Count cards copies, only remembering pending copies as a ring buffer of deltas.
 
-def part_two() -> int:
-    card_number: DefaultDict[int, int] = defaultdict(lambda : 1)
+    A card with n matches and c copies adds c to the copies of the n next cards,
+    stored as +c on the next card and -c after the last one (prefix difference).
+    The running sum of deltas gives the copies won by the current card, in O(1) per card.
+    Memory is bounded by the highest matches count, not by the number of cards.
+    """
 
-    with open("input.txt", mode="r") as f_input:
-        for index, line in enumerate(f_input.readlines()):
-            _game, _separator, values = line.strip().partition(":")
-            winning_numbers_str, _separator, my_numbers_str = values.partition("|")
+    deltas: List[int]
+    index: int  # Index of the next card
+    won_copies: int  # Running sum of the deltas
+    total: int
+
+    def __init__(self, size: int = 16) -> None:
+        self.deltas = [0] * size
+        self.index = 0
+        self.won_copies = 0
+        self.total = 0
+
+    def add_card(self, matches: int) -> int:
+        """Register the next card and return its number of instances."""
+        if matches + 1 > len(self.deltas):
+            self.grow(2 * (matches + 1))
+
+        size: int = len(self.deltas)
+        slot: int = self.index % size
+        self.won_copies += self.deltas[slot]
+        self.deltas[slot] = 0
+
+        copies: int = 1 + self.won_copies
+        if matches:
+            self.deltas[(self.index + 1) % size] += copies
+            self.deltas[(self.index + 1 + matches) % size] -= copies
 
-            # Init line count if one
-            card_number[index]  # pylint: disable=pointless-statement
+        self.index += 1
+        self.total += copies
+        return copies
 
-            # From string to int
-            winning_numbers = {int(x) for x in winning_numbers_str.split(" ") if x != ""}
-            my_numbers = {int(x) for x in my_numbers_str.split(" ") if x != ""}
+    def grow(self, size: int) -> None:
+        """Move pending deltas to a larger ring."""
+        deltas: List[int] = [0] * size
+        for card_index in range(self.index, self.index + len(self.deltas)):
+            deltas[card_index % size] = self.deltas[card_index % len(self.deltas)]
+        self.deltas = deltas
 
-            # Find all common numbers
-            common_numbers = winning_numbers.intersection(my_numbers)
 
-            for ind in range(len(common_numbers)):
-                card_number[index + ind + 1] += card_number[index]
+def score_cards(lines: Iterable[str]) -> Tuple[int, int]:
+    """Compute both the points and the total number of cards in a single pass."""
+    points: int = 0
+    card_number: CopyPropagator = CopyPropagator()
 
-    return sum(card_number.values())
+    for line in lines:
+        matches: int = count_matches(line)
 
+        if matches:
+            points += 1 << (matches - 1)
+
+        card_number.add_card(matches)
+
+    return points, card_number.total
+
+
+if __name__ == "__main__":
+    with open("input.txt", mode="r") as f_input:
+        part_one, part_two = score_cards(f_input)
 
-print("Part one:", part_one())
-print("Part two:", part_two())
+    print("Part one:", part_one)
+    print("Part two:", part_two)
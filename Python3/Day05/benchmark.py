@@ -0,0 +1,61 @@
+"""Compare the forward and inverse part two strategies on a generated almanac with huge seed ranges."""
+
+from typing import *
+import argparse
+import random
+import time
+
+from day5 import AlmanacMapping, Maping, ValueRange, min_location_forward, min_location_inverse
+
+
+def generate_almanac(rules_per_section: int, seed: int = 2023) -> List[Maping]:
+    """Generate 7 sections, each one shuffling blocks of [0, 2^32) like the puzzle input."""
+    rng: random.Random = random.Random(seed)
+    mapings: List[Maping] = []
+
+    for _ in range(7):
+        cuts: List[int] = sorted(rng.sample(range(1, 1 << 32), rules_per_section))
+        blocks: List[Tuple[int, int]] = list(zip([0] + cuts[:-1], cuts))
+        destinations: List[Tuple[int, int]] = blocks.copy()
+        rng.shuffle(destinations)
+
+        mp: Maping = Maping()
+        for (src_start, src_end), (dst_start, dst_end) in zip(blocks, destinations):
+            length: int = min(src_end - src_start, dst_end - dst_start)
+            mp.add_range(dst_start, src_start, length)
+        mapings.append(mp)
+
+    return mapings
+
+
+def generate_seed_ranges(range_number: int, seed: int = 2023) -> List[ValueRange]:
+    rng: random.Random = random.Random(seed)
+    starts: List[int] = rng.sample(range(1 << 32), range_number)
+    return [ValueRange(start, start + rng.randint(1, 1 << 20)) for start in starts]
+
+
+def timed(name: str, function: Callable[[], Any]) -> Any:
+    start: float = time.perf_counter()
+    result: Any = function()
+    print(f"{name:<20} {time.perf_counter() - start:8.3f}s")
+    return result
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument("--rules", type=int, nargs="+", default=[50, 500, 5_000], help="Rules per section")
+    parser.add_argument("--seed-ranges", type=int, default=1_000)
+    args: argparse.Namespace = parser.parse_args()
+
+    seed_ranges: List[ValueRange] = generate_seed_ranges(args.seed_ranges)
+
+    for rules_per_section in args.rules:
+        print(f"== {rules_per_section} rules per section, {args.seed_ranges} seed ranges ==")
+        mapings: List[Maping] = generate_almanac(rules_per_section)
+
+        forward: int = timed("forward", lambda: min_location_forward(seed_ranges, mapings))
+        mapping: AlmanacMapping = timed("compose", lambda: AlmanacMapping.compose(mapings))
+        inverse: int = timed("inverse", lambda: min_location_inverse(seed_ranges, mapping))
+
+        if forward != inverse:
+            raise RuntimeError(f"Strategies disagree: {forward} != {inverse}")
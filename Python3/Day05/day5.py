@@ -1,4 +1,10 @@
+from bisect import bisect_right
 from typing import *
+import argparse
+import hashlib
+import os
+
+import numpy as np
 
 
 class ValueRange:
@@ -13,99 +19,87 @@ class ValueRange:
         self.end: int = end
         self.length: int = end - start
 
-    # Comparison
-
-    def intersects(self, other: 'ValueRange') -> bool:
-        """Determine if two ranges intersect."""
-        # 1. No intersection
-        if self.end <= other.start or other.end <= self.start:
-            return False
-        return True
-
-    def is_overlapped_by(self, other: 'ValueRange') -> bool:
-        return other.start <= self.start and self.end <= other.end
-
-    # Operations
-
-    def apply_mapping(self, src_range: 'ValueRange', dst_range: 'ValueRange') -> Set['ValueRange']:
-        """Return ranges defined by applying the mapping to this range."""
-        # 1. Self is contained in the mapping
-        if self.is_overlapped_by(src_range):
-            start_delta: int = self.start - src_range.start
-            # print(f"> Input {self} overlapped by src_range {src_range}", start_delta)
-            # print("> Returning", ValueRange(dst_range.start + start_delta, dst_range.start + start_delta + self.length))
-            return {ValueRange(dst_range.start + start_delta, dst_range.start + start_delta + self.length)}
-
-        result: Set['ValueRange'] = set()
-
-        # 2. The mapping is contained in self.
-        # We want to map already mapped values (in self) to their new values
-        # Thus, we are looking for values in self we can also find in src_range
-        # Other values (in self but not in src_range) will be mapped to themselves
-        if src_range.is_overlapped_by(self):
-            # print(f"> src_range {src_range} overlapped by input {self}")
-            result.add(ValueRange(self.start, src_range.start))  # Values before mapping
-            result.add(ValueRange(src_range.end, self.end))  # Values after mapping
-            result.add(dst_range)  # Mapped values
-            return result
-
-        # 3. The two ranges are partially overlapping.
-        # This will produce two ranges, a subpart of the dst_range and a subpart of self
-        if self.start < src_range.start:
-            overlap_length: int = self.end - src_range.start  # self.end can't be higher than src_range.end (case 2)
-            result.add(ValueRange(self.start, src_range.start))  # Unmapped values smaller than mapping
-            result.add(ValueRange(dst_range.start, dst_range.start + overlap_length))
-        else:  # src_range.start < self.start
-            overlap_length = src_range.end - self.start  # src_range.end can't be higher than self.end (case 1)
-            result.add(ValueRange(src_range.end, self.end))  # Unmapped values higher than mapping
-            result.add(ValueRange(dst_range.start + (dst_range.length - overlap_length), dst_range.end))
-        return result
-
     def __repr__(self) -> str:
         return f"ValueRange(start={self.start}, end={self.end})"
 
 
-class RangeManager:
-
-    ranges: Set[ValueRange]
-
-    def __init__(self, input_ranges: Set[ValueRange]) -> None:
-        self.ranges: Set[ValueRange] = input_ranges
+class PiecewiseMapping:
+    """A whole almanac section, as a piecewise-linear function.
+
+    Sources are sorted and do not overlap, values out of all sources are mapped to themselves.
+    """
+
+    starts: List[int]  # Sorted sources starts
+    ends: List[int]  # Sources ends (excluded)
+    offsets: List[int]  # Destination start - source start
+
+    def __init__(self, maping: 'Maping') -> None:
+        self.starts = []
+        self.ends = []
+        self.offsets = []
+
+        for src_range, dst_start in sorted(maping.map.items(), key=lambda item: item[0].start):
+            if self.ends and src_range.start < self.ends[-1]:
+                raise ValueError(f"Overlapping mapping sources at {src_range.start}")
+            self.starts.append(src_range.start)
+            self.ends.append(src_range.stop)
+            self.offsets.append(dst_start - src_range.start)
+
+    def map_range(self, value_range: ValueRange) -> Iterator[ValueRange]:
+        """Split the range along the sources it crosses and map each part."""
+        start: int = value_range.start
+        end: int = value_range.end
+
+        # First source which may contain values of the range
+        idx: int = bisect_right(self.ends, start)
+
+        while start < end:
+            if idx == len(self.starts) or end <= self.starts[idx]:
+                # No more sources: the rest is unchanged
+                yield ValueRange(start, end)
+                return
+
+            if start < self.starts[idx]:
+                # Unchanged values before the source
+                yield ValueRange(start, self.starts[idx])
+                start = self.starts[idx]
+
+            stop: int = min(end, self.ends[idx])
+            yield ValueRange(start + self.offsets[idx], stop + self.offsets[idx])
+            start = stop
+            idx += 1
+
+    def map_ranges(self, ranges: Iterable[ValueRange]) -> List[ValueRange]:
+        return merge_ranges(
+            mapped_range
+            for value_range in ranges
+            for mapped_range in self.map_range(value_range)
+        )
+
+
+def merge_ranges(ranges: Iterable[ValueRange]) -> List[ValueRange]:
+    """Sort the ranges and merge the ones overlapping or touching each other."""
+    result: List[ValueRange] = []
+    for value_range in sorted(ranges, key=lambda rng: rng.start):
+        if result and value_range.start <= result[-1].end:
+            if result[-1].end < value_range.end:
+                result[-1] = ValueRange(result[-1].start, value_range.end)
+        else:
+            result.append(value_range)
+    return result
 
-    def apply_range(self, dst_start, src_start, length) -> None:
-        _before_state = self.ranges.copy()
 
-        src_range: ValueRange = ValueRange(src_start, src_start + length)
-        dst_range: ValueRange = ValueRange(dst_start, dst_start + length)
-
-        # Look for intersection, and remove from list
-        intersecting_ranges: Set[ValueRange] = set()
-        for rng in self.ranges:
-            if rng.intersects(src_range):
-                intersecting_ranges.add(rng)
-        self.ranges = self.ranges - intersecting_ranges
-
-        # Compute the produced ranges
-        produced_ranges: Set[ValueRange] = set()
-        for int_range in intersecting_ranges:
-            for prod_range in int_range.apply_mapping(src_range, dst_range):
-                produced_ranges.add(prod_range)
+class RangeManager:
+    """Push ranges of values through the almanac sections."""
 
-        # Add them back
-        self.ranges = self.ranges.union(produced_ranges)
+    ranges: List[ValueRange]
 
-        if False and self.ranges.difference(_before_state):
-            print("Mapping src:", src_range)
-            print("Mapping dst:", dst_range)
-            print("Previousstate:",  " - ".join(repr(x) for x in sorted(_before_state, key=lambda x: x.start)))
-            self.print_state()
-            print()
-            #input()
-            #breakpoint()
+    def __init__(self, input_ranges: Iterable[ValueRange]) -> None:
+        self.ranges = merge_ranges(input_ranges)
 
+    def apply_mapping(self, mapping: PiecewiseMapping) -> None:
+        self.ranges = mapping.map_ranges(self.ranges)
 
-    def print_state(self) -> None:
-        print("Current state:", " - ".join(repr(x) for x in sorted(self.ranges, key=lambda x: x.start)))
 
 class Maping:
     """Represent a X to Y mapping."""
@@ -119,88 +113,225 @@ class Maping:
     def add_range(self, dst_start, src_start, length) -> None:
         self.map[range(src_start, src_start + length)] = dst_start
 
-    def map_value(self, value: int) -> int:
-        for rang, dst_start in self.map.items():
-            if value in rang:
-                return dst_start + (value - rang.start)
-        return value
 
-    def map_range(self, value_range: List[int]):
-        return [self.map_value(val) for val in value_range]
+def parse_seeds(line: str) -> List[int]:
+    raw_seeds = line.partition(":")[2]
+    return [int(x) for x in raw_seeds.split(" ") if x != ""]
 
 
-def part_one() -> int:
+def parse_almanac(lines: Iterable[str]) -> Tuple[List[int], List[Maping]]:
     seeds: List[int] = []
     mapings: List[Maping] = []
 
-    with open("input.txt", mode='r') as f_input:
-        for line in f_input.readlines():
-            line = line.strip()
+    for line in lines:
+        line = line.strip()
+
+        # Ignore empty lines
+        if not line:
+            continue
+
+        if line.startswith("seeds:"):
+            seeds = parse_seeds(line)
+
+        elif line.endswith("map:"):
+            mapings.append(Maping())  # add a new mapping
+
+        else:  # Adding a range to the last Maping
+            values: List[int] = [int(x) for x in line.split(" ") if x != ""]
+            if len(values) != 3:
+                raise ValueError(f"Unable to find 3 digits in line {line}")
+
+            mapings[-1].add_range(*values)
+
+    return seeds, mapings
+
+
+class AlmanacMapping:
+    """Piecewise-linear function defined on all (non-negative) values, as a breakpoint table.
+
+    Segment i maps values in [starts[i], starts[i+1]) by adding offsets[i], the last one is unbounded.
+    """
+
+    starts: List[int]  # Sorted, starts[0] = 0
+    offsets: List[int]
+
+    CACHE_DIR: str = ".cache"
+
+    def __init__(self, starts: List[int], offsets: List[int]) -> None:
+        # Merge consecutive segments sharing the same offset
+        self.starts = []
+        self.offsets = []
+        for start, offset in zip(starts, offsets):
+            if self.offsets and self.offsets[-1] == offset:
+                continue
+            self.starts.append(start)
+            self.offsets.append(offset)
+
+    @classmethod
+    def from_section(cls, mapping: PiecewiseMapping) -> 'AlmanacMapping':
+        starts: List[int] = [0]
+        offsets: List[int] = [0]
+        for start, end, offset in zip(mapping.starts, mapping.ends, mapping.offsets):
+            if start == starts[-1]:
+                offsets[-1] = offset
+            else:
+                starts.append(start)
+                offsets.append(offset)
+            # Values after the source are unchanged (until the next source)
+            starts.append(end)
+            offsets.append(0)
+        return cls(starts, offsets)
+
+    @classmethod
+    def compose(cls, mapings: List[Maping]) -> 'AlmanacMapping':
+        """Compose all sections into a single function, applying them in order."""
+        result: AlmanacMapping = cls([0], [0])
+        for mp in mapings:
+            result = result.then(cls.from_section(PiecewiseMapping(mp)))
+        return result
 
-            # Ignore empty lines
-            if not line:
+    def then(self, other: 'AlmanacMapping') -> 'AlmanacMapping':
+        """Return the function applying self, then other."""
+        starts: List[int] = []
+        offsets: List[int] = []
+
+        for idx, (start, offset) in enumerate(zip(self.starts, self.offsets)):
+            end: Optional[int] = self.starts[idx + 1] if idx + 1 < len(self.starts) else None
+
+            # Split the image of the segment along other's breakpoints
+            other_idx: int = bisect_right(other.starts, start + offset) - 1
+            starts.append(start)
+            offsets.append(offset + other.offsets[other_idx])
+
+            other_idx += 1
+            while other_idx < len(other.starts) and (end is None or other.starts[other_idx] < end + offset):
+                starts.append(other.starts[other_idx] - offset)
+                offsets.append(offset + other.offsets[other_idx])
+                other_idx += 1
+
+        return AlmanacMapping(starts, offsets)
+
+    def map_values(self, values: np.ndarray) -> np.ndarray:
+        """Map a batch of values at once."""
+        segments: np.ndarray = np.searchsorted(np.array(self.starts, dtype=np.int64), values, side="right") - 1
+        return values + np.array(self.offsets, dtype=np.int64)[segments]
+
+    def find_min_image(self, ranges: List[ValueRange]) -> Optional[int]:
+        """Return the smallest image of the values in the ranges, without looking at the values one by one.
+
+        Walks the destination breakpoints in ascending order and maps them back to their pre-image,
+        stopping as soon as no further segment can produce a smaller image.
+        """
+        ranges = merge_ranges(ranges)
+        range_ends: List[int] = [rng.end for rng in ranges]
+
+        # Segments by ascending destination
+        image_starts: List[Tuple[int, int]] = sorted(
+            (start + offset, idx) for idx, (start, offset) in enumerate(zip(self.starts, self.offsets))
+        )
+
+        best: Optional[int] = None
+        for image_start, idx in image_starts:
+            if best is not None and best <= image_start:
+                break
+
+            # Pre-image of the segment
+            start: int = self.starts[idx]
+            end: Optional[int] = self.starts[idx + 1] if idx + 1 < len(self.starts) else None
+
+            # Smallest value of the ranges in the pre-image
+            range_idx: int = bisect_right(range_ends, start)
+            if range_idx == len(ranges):
+                continue
+            value: int = max(start, ranges[range_idx].start)
+            if end is not None and end <= value:
                 continue
 
-            if line.startswith("seeds:"):
-                raw_seeds = line.partition(":")[2]
-                seeds = [int(x) for x in raw_seeds.split(" ") if x != ""]
+            image: int = value + self.offsets[idx]
+            if best is None or image < best:
+                best = image
+
+        return best
+
+    # Disk cache
+
+    @classmethod
+    def load(cls, path: str) -> Tuple[List[int], 'AlmanacMapping']:
+        """Return the almanac file's seeds and composed sections.
 
-            elif line.endswith("map:"):
-                mapings.append(Maping())  # add a new mapping
+        The file is read once, the composition being reused from a previous result cached for the same content.
+        """
+        with open(path, mode='rb') as f_input:
+            content: bytes = f_input.read()
+        cache_path: str = os.path.join(cls.CACHE_DIR, f"almanac-{hashlib.sha256(content).hexdigest()}.npz")
 
-            else:  # Adding a range to the last Maping
-                values: List[int] = [int(x) for x in line.split(" ") if x != ""]
-                if len(values) != 3:
-                    raise ValueError(f"Unable to find 3 digits in line {line}")
+        if os.path.exists(cache_path):
+            # Seeds are on the first line, no need to parse the sections
+            seeds: List[int] = parse_seeds(content.partition(b"\n")[0].decode())
+            with np.load(cache_path) as cached:
+                return seeds, cls(cached["starts"].tolist(), cached["offsets"].tolist())
 
-                mapings[-1].add_range(*values)
+        seeds, mapings = parse_almanac(content.decode().splitlines())
+        mapping: AlmanacMapping = cls.compose(mapings)
+
+        os.makedirs(cls.CACHE_DIR, exist_ok=True)
+        np.savez(cache_path, starts=np.array(mapping.starts, dtype=np.int64), offsets=np.array(mapping.offsets, dtype=np.int64))
+        return seeds, mapping
+
+
+def part_one() -> int:
+    seeds, mapping = AlmanacMapping.load("input.txt")
 
     # Compute minimum
-    current_range: List[int] = list(seeds)
+    locations: np.ndarray = mapping.map_values(np.array(seeds, dtype=np.int64))
+    return int(locations.min())
+
+
+def to_seed_ranges(raw_int_seeds: List[int]) -> List[ValueRange]:
+    return [
+        ValueRange(raw_int_seeds[idx], raw_int_seeds[idx] + raw_int_seeds[idx+1])
+        for idx in range(0, len(raw_int_seeds), 2)
+    ]
+
+
+def min_location_forward(seed_ranges: List[ValueRange], mapings: List[Maping]) -> int:
+    """Push the seed ranges through each section."""
+    range_manager: RangeManager = RangeManager(seed_ranges)
+
     for mp in mapings:
-        current_range = mp.map_range(current_range)
+        range_manager.apply_mapping(PiecewiseMapping(mp))
 
-    return min(current_range)
+    return range_manager.ranges[0].start
 
 
-def part_two() -> int:
-    range_manager: Optional[RangeManager] = None
+def min_location_inverse(seed_ranges: List[ValueRange], mapping: AlmanacMapping) -> int:
+    """Look for the first location whose pre-image is a seed."""
+    location: Optional[int] = mapping.find_min_image(seed_ranges)
+    if location is None:
+        raise ValueError("No seed to locate")
+    return location
 
-    with open("example.txt", mode='r') as f_input:
-        for line in f_input.readlines():
-            line = line.strip()
 
-            # Ignore empty lines
-            if not line:
-                continue
+STRATEGIES: List[str] = ["forward", "inverse"]
+
+
+def part_two(strategy: str = "forward") -> int:
+    if strategy == "forward":
+        with open("input.txt", mode='r') as f_input:
+            raw_int_seeds, mapings = parse_almanac(f_input)
+        return min_location_forward(to_seed_ranges(raw_int_seeds), mapings)
+
+    if strategy == "inverse":
+        raw_int_seeds, mapping = AlmanacMapping.load("input.txt")
+        return min_location_inverse(to_seed_ranges(raw_int_seeds), mapping)
+
+    raise ValueError(f"Unknown strategy {strategy}")
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument("--strategy", choices=STRATEGIES, default="forward", help="Part two resolution strategy")
+    args: argparse.Namespace = parser.parse_args()
 
-            if line.startswith("seeds:"):
-                raw_seeds: str = line.partition(":")[2]
-                raw_int_seeds: List[int] = [int(x) for x in raw_seeds.split(" ") if x != ""]
-                seeds: Set[ValueRange] = {
-                    ValueRange(raw_int_seeds[idx], raw_int_seeds[idx] + raw_int_seeds[idx+1])
-                    for idx in range(0, len(raw_int_seeds), 2)
-                }
-                range_manager = RangeManager(seeds)
-
-            elif line.endswith("map:"):
-                range_manager.print_state()
-                print("\n", line)
-                continue  # Ignore these lines
-
-            else:  # Create a ValueRange
-                values: List[int] = [int(x) for x in line.split(" ") if x != ""]
-                if len(values) != 3:
-                    raise ValueError(f"Unable to find 3 digits in line {line}")
-                if range_manager is None:
-                    raise RuntimeError("Range manager should be initialized")
-                range_manager.apply_range(*values)
-
-    if range_manager is None:
-        raise RuntimeError("Range manager should be initialized")
-    print("\n".join(repr(x) for x in range_manager.ranges))
-    return min(range.start for range in range_manager.ranges)
-
-
-#print("Part one:", part_one())
-print("Part two:", part_two())
+    print("Part one:", part_one())
+    print("Part two:", part_two(args.strategy))
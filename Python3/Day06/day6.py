@@ -26,97 +26,89 @@ Here:
 -T +- sqrt(delta) / -2  <=>  +- sqrt(delta) + T / 2
 delta = T² - 4(-1)(-R) = T² - 4R
 
+Winning presses are the integers strictly between the two solutions, symmetric around T / 2.
+Using s = isqrt(delta) instead of a float square root keeps everything exact:
+the first winning press is either (T - s) // 2 or the next integer.
 """
 
 from typing import *
 import math
 
+import numpy as np
 
-def solve_race(time: int, record: int) -> Tuple[Optional[float], Optional[float]]:
-    delta: float = time * time - 4 * record
-
-    if delta < 0:
-        return (None, None)
-    if delta == 0:
-        solution = time / 2
-        return (solution, None)
-
-    solution1 = (-math.sqrt(delta) + time) / 2
-    solution2 = (math.sqrt(delta) + time) / 2
-    return (solution1, solution2)
 
+# Largest values handled with int64 arrays: T² and 4R stay below 2^63
+INT64_MAX_TIME: int = 1 << 31
+INT64_MAX_RECORD: int = 1 << 60
 
-def part_one() -> int:
-    total_time: List[int] = []
-    best_dist: List[int] = []
 
-    with open("input.txt", mode="r") as f_input:
-        lines: List[str] = f_input.readlines()
-
-    total_time = [int(x) for x in lines[0].strip().partition(":")[2].split(" ") if x != ""]
-    best_dist = [int(x) for x in lines[1].strip().partition(":")[2].split(" ") if x != ""]
+def count_winning_presses(time: int, record: int) -> int:
+    """Exact number of ways to beat the record, whatever the size of the integers."""
+    delta: int = time * time - 4 * record
+    if delta < 0:
+        return 0
 
-    results: List[int] = []
+    first_press: int = (time - math.isqrt(delta)) // 2
+    if first_press * (time - first_press) <= record:
+        first_press += 1
 
-    for time, record in zip(total_time, best_dist):
-        sol1, sol2 = solve_race(time, record)
+    return max(time - 2 * first_press + 1, 0)
 
-        if sol1 is None or sol2 is None:
-            raise RuntimeError("No solution")
 
-        min_sol: int = math.ceil(sol1)
-        max_sol: int = math.floor(sol2)
+def count_winning_presses_batch(times: Sequence[int], records: Sequence[int]) -> np.ndarray:
+    """Evaluate many races at once.
 
-        # Small tweak to take into account integer solutions which reduce the number of solutions
-        range_delta: int = 1
-        if int(sol1) == sol1:
-            range_delta -= 1
-        if int(sol2) == sol2:
-            range_delta -= 1
+    Uses int64 arrays when no intermediate value can overflow,
+    and falls back on object arrays of Python integers otherwise.
+    """
+    fits_int64: bool = (
+        all(0 <= time < INT64_MAX_TIME for time in times)
+        and all(0 <= record < INT64_MAX_RECORD for record in records)
+    )
+    if fits_int64:
+        time_arr: np.ndarray = np.array(times, dtype=np.int64)
+        record_arr: np.ndarray = np.array(records, dtype=np.int64)
 
-        results.append(max_sol - min_sol + range_delta)
+        delta: np.ndarray = time_arr * time_arr - 4 * record_arr
+        # Float square root, then corrected to the exact integer square root
+        root: np.ndarray = np.floor(np.sqrt(np.maximum(delta, 0).astype(np.float64))).astype(np.int64)
+        root -= root * root > delta
+        root += (root + 1) * (root + 1) <= delta
 
-    res = 1
-    for x in results:
-        res = res * x
-    return res
+        first_press: np.ndarray = (time_arr - root) // 2
+        first_press += first_press * (time_arr - first_press) <= record_arr
 
+        return np.where(delta < 0, 0, np.maximum(time_arr - 2 * first_press + 1, 0))
 
-def part_two() -> int:
-    """Exactly the same thing with a modified input (which I did manually)."""
-    total_time: List[int] = []
-    best_dist: List[int] = []
+    return np.frompyfunc(count_winning_presses, 2, 1)(
+        np.array(times, dtype=object), np.array(records, dtype=object)
+    )
 
-    with open("input-2.txt", mode="r") as f_input:
-        lines: List[str] = f_input.readlines()
 
-    total_time = [int(x) for x in lines[0].strip().partition(":")[2].split(" ") if x != ""]
-    best_dist = [int(x) for x in lines[1].strip().partition(":")[2].split(" ") if x != ""]
+def parse_races(lines: List[str]) -> Tuple[List[str], List[str]]:
+    """Keep raw numbers, part two reads them without the spaces."""
+    total_time: List[str] = lines[0].strip().partition(":")[2].split()
+    best_dist: List[str] = lines[1].strip().partition(":")[2].split()
+    return total_time, best_dist
 
-    results: List[int] = []
 
-    for time, record in zip(total_time, best_dist):
-        sol1, sol2 = solve_race(time, record)
+total_time: List[str]
+best_dist: List[str]
+with open("input.txt", mode="r") as f_input:
+    total_time, best_dist = parse_races(f_input.readlines())
 
-        if sol1 is None or sol2 is None:
-            raise RuntimeError("No solution")
 
-        min_sol: int = math.ceil(sol1)
-        max_sol: int = math.floor(sol2)
+def part_one(total_time: List[str], best_dist: List[str]) -> int:
+    results: np.ndarray = count_winning_presses_batch(
+        [int(x) for x in total_time], [int(x) for x in best_dist]
+    )
+    return math.prod(results.tolist())
 
-        # Small tweak to take into account integer solutions which reduce the number of solutions
-        range_delta: int = 1
-        if int(sol1) == sol1:
-            range_delta -= 1
-        if int(sol2) == sol2:
-            range_delta -= 1
 
-        results.append(max_sol - min_sol + range_delta)
+def part_two(total_time: List[str], best_dist: List[str]) -> int:
+    """A single race, ignoring the spaces between numbers."""
+    return count_winning_presses(int("".join(total_time)), int("".join(best_dist)))
 
-    res = 1
-    for x in results:
-        res = res * x
-    return res
 
-print("Part one:", part_one())
-print("Part two:", part_two())
+print("Part one:", part_one(total_time, best_dist))
+print("Part two:", part_two(total_time, best_dist))
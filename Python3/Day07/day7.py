@@ -1,159 +1,154 @@
+from collections import Counter
 from enum import Enum
 from typing import *
+import argparse
+import os
 
+import numpy as np
 
-class Card(Enum):
-    ACE =   "A"
-    KING =  "K"
-    QUEEN = "Q"
-    TEN =   "T"
-    NINE =  "9"
-    EIGHT = "8"
-    SEVEN = "7"
-    SIX =   "6"
-    FIVE =  "5"
-    FOUR =  "4"
-    THREE = "3"
-    TWO =   "2"
-    JOKER = "J"
-
-    def get_value(self) -> int:
-        return [
-            "J",  # 0
-            "2",  # 1
-            "3",  # 2
-            "4",  # 3
-            "5",  # 4
-            "6",  # 5
-            "7",  # 6
-            "8",  # 7
-            "9",  # 8
-            "T",  # 9
-            "Q",  # 10
-            "K",  # 11
-            "A",  # 12
-        ].index(self.value)
-
-class Hand:
-    """Mother class for all poker hands."""
-
-    rank: int  # The higher the better
-    pattern: List[int]
-
-    raw_cards: List[Card]
-    cards: List[Card]
-    score: int
-    bid: int
-
-    UPGRADE_MAPPING: Dict[str, Dict[int, int]] = {}
-
-    subclasses: Set[Type['Hand']] = set()
-
-    def __init__(self, cards: List[Card], bid: int) -> None:
-        self.raw_cards = cards
-        self.cards = sorted(cards, key=lambda x: cards.count(x) * pow(2, 5) + x.get_value(), reverse=True)
-        self.bid: int = bid
-
-        # Handle Joker
-        joker_nbr: int = cards.count(Card.JOKER)
-        if joker_nbr != 0:
-            self.rank = self.cast_rank(joker_nbr)
-
-        self.score: int = 0
-        for ind, crd in enumerate(reversed(cards)):
-            self.score += crd.get_value() * pow(2, 4 * ind)
-        self.score += self.rank * pow(2, 4 * (len(cards) + 1))
-
-    def __init_subclass__(cls) -> None:
-        Hand.subclasses.add(cls)
-
-    def cast_rank(self, joker_nbr: int) -> int:
-        return self.UPGRADE_MAPPING[type(self).__name__][joker_nbr]
-
-    @classmethod
-    def determine_hand(cls, hand: List[Card]) -> Type['Hand']:
-        hand_pattern: List[int] = sorted((hand.count(crd) for crd in hand), reverse=True)
-        # Find the correponding hand
-        for subcls in cls.subclasses:
-            if hand_pattern == subcls.pattern:
-                return subcls
-        raise ValueError(f"No hand found for {hand} (pattern={hand_pattern})")
-
-
-class Five(Hand):
-    """Five of a kind."""
-    rank: int = 6
-    pattern: List[int] = [5, 5, 5, 5, 5]
-
-
-class Four(Hand):
-    """Four of a kind."""
-    rank: int = 5
-    pattern: List[int] = [4, 4, 4, 4, 1]
-
-
-class House(Hand):
-    """Full house."""
-    rank: int = 4
-    pattern: List[int] = [3, 3, 3, 2, 2]
-
-
-class Three(Hand):
-    """Three of a kind."""
-    rank: int = 3
-    pattern: List[int] = [3, 3, 3, 1, 1]
-
-
-class TwoPair(Hand):
-    """Two pairs."""
-    rank: int = 2
-    pattern: List[int] = [2, 2, 2, 2, 1]
-
-
-class OnePair(Hand):
-    """One pair."""
-    rank: int = 1
-    pattern: List[int] = [2, 2, 1, 1, 1]
 
+# Cards by increasing strength, for each set of rules
+CARD_ORDER: str = "23456789TJQKA"
+JOKER_CARD_ORDER: str = "J23456789TQKA"  # Jokers are the weakest cards
 
-class HighCard(Hand):
-    """High card."""
-    rank: int = 0
-    pattern: List[int] = [1, 1, 1, 1, 1]
+CARD_VALUES: Dict[str, int] = {card: value for value, card in enumerate(CARD_ORDER)}
+JOKER_CARD_VALUES: Dict[str, int] = {card: value for value, card in enumerate(JOKER_CARD_ORDER)}
 
 
-Hand.UPGRADE_MAPPING.update(
-    {
-        'Five':     {5: Five.rank},
-        'Four':     {1: Five.rank,  4: Five.rank},
-        'House':    {2: Five.rank,  3: Five.rank},
-        'Three':    {1: Four.rank,  3: Four.rank},
-        'TwoPair':  {1: House.rank, 2: Four.rank},
-        'OnePair':  {1: Three.rank, 2: Three.rank},
-        'HighCard': {1: OnePair.rank},
-    }
-)
+class HandType(Enum):
+    """All poker hands, by increasing strength. Values are the cards counts, sorted."""
+    HIGH_CARD = (1, 1, 1, 1, 1)
+    ONE_PAIR = (2, 1, 1, 1)
+    TWO_PAIR = (2, 2, 1)
+    THREE = (3, 1, 1)
+    HOUSE = (3, 2)
+    FOUR = (4, 1)
+    FIVE = (5,)
 
+    def get_rank(self) -> int:
+        return HAND_TYPE_RANKS[self]
 
-def part_two() -> int:
-    all_hand: List[Hand] = []
 
-    with open("input.txt", mode="r") as f_input:
-        for line in f_input.readlines():
-            cards, _, bid = line.strip().partition(" ")
+HAND_TYPE_RANKS: Dict[HandType, int] = {hand_type: rank for rank, hand_type in enumerate(HandType)}
+
+
+def determine_hand(cards: str, jokers: bool = False) -> HandType:
+    counter: Counter[str] = Counter(cards)
+
+    # Jokers act like the most common other card
+    joker_nbr: int = counter.pop("J", 0) if jokers else 0
+    pattern: List[int] = sorted(counter.values(), reverse=True) or [0]
+    pattern[0] += joker_nbr
+
+    return HandType(tuple(pattern))
+
+
+def get_hand_key(cards: str, jokers: bool = False) -> int:
+    """Pack the hand into an integer sorting like the hands: a 4-bit type rank, then five 4-bit card values."""
+    card_values: Dict[str, int] = JOKER_CARD_VALUES if jokers else CARD_VALUES
+
+    key: int = determine_hand(cards, jokers).get_rank()
+    for card in cards:
+        key = (key << 4) | card_values[card]
+    return key
+
+
+def compute_winnings(hands: List[Tuple[str, int]], jokers: bool = False) -> int:
+    keys: List[Tuple[int, int]] = sorted((get_hand_key(cards, jokers), bid) for cards, bid in hands)
+    return sum((idx + 1) * bid for idx, (_key, bid) in enumerate(keys))
+
+
+# Lookup table over all hands
+
+# A hand is encoded in base 13, using each card index in CARD_ORDER
+HAND_NUMBER: int = len(CARD_ORDER) ** 5
+CARD_WEIGHTS: np.ndarray = len(CARD_ORDER) ** np.arange(4, -1, -1, dtype=np.int64)
+
+CACHE_PATH: str = os.path.join(".cache", "hand-types.npy")
+
+
+def build_hand_type_table() -> np.ndarray:
+    """Compute the type rank of every possible hand, as a (2, 13^5) array: standard rules, then joker rules."""
+    digits: np.ndarray = np.stack(np.unravel_index(np.arange(HAND_NUMBER), (len(CARD_ORDER),) * 5), axis=1)
+    counts: np.ndarray = (digits[:, :, np.newaxis] == np.arange(len(CARD_ORDER))).sum(axis=1)
 
-            card_list: List[Card] = [Card(x) for x in cards]
-            hand_type: Type[Hand] = Hand.determine_hand(card_list)
+    # A hand type only depends on its two highest cards counts
+    rank_by_counts: np.ndarray = np.zeros((6, 6), dtype=np.uint8)
+    for hand_type in HandType:
+        pattern: Tuple[int, ...] = hand_type.value + (0,)
+        rank_by_counts[pattern[0], pattern[1]] = hand_type.get_rank()
 
-            hand: Hand = hand_type(card_list, int(bid))
-            all_hand.append(hand)
+    table: np.ndarray = np.empty((2, HAND_NUMBER), dtype=np.uint8)
 
-    sorted_hands: List[Hand] = sorted(all_hand, key=lambda x: x.score)
+    sorted_counts: np.ndarray = -np.sort(-counts, axis=1)
+    table[0] = rank_by_counts[sorted_counts[:, 0], sorted_counts[:, 1]]
 
-    return sum((idx + 1) * hand.bid for idx, hand in enumerate(sorted_hands))
+    # Jokers act like the most common other card
+    joker_idx: int = CARD_VALUES["J"]
+    joker_nbr: np.ndarray = counts[:, joker_idx].copy()
+    counts[:, joker_idx] = 0
+    sorted_counts = -np.sort(-counts, axis=1)
+    table[1] = rank_by_counts[sorted_counts[:, 0] + joker_nbr, sorted_counts[:, 1]]
 
-# To switch between parts one and two, I changed manually the cards order
-# and added the hand upgrade code
+    return table
 
-# print("Part one:", part_one())
-print("Part two:", part_two())
+
+def load_hand_type_table() -> np.ndarray:
+    """Load the table from the disk cache, building it on first use."""
+    if os.path.exists(CACHE_PATH):
+        return np.load(CACHE_PATH)
+
+    table: np.ndarray = build_hand_type_table()
+    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+    np.save(CACHE_PATH, table)
+    return table
+
+
+def compute_winnings_batch(hands: List[Tuple[str, int]], table: np.ndarray, jokers: bool = False) -> int:
+    """Same as compute_winnings, with array operations only."""
+    card_indexes: np.ndarray = np.zeros(256, dtype=np.int64)
+    card_indexes[np.frombuffer(CARD_ORDER.encode(), dtype=np.uint8)] = np.arange(len(CARD_ORDER))
+
+    raw_cards: bytes = "".join(cards for cards, _bid in hands).encode()
+    digits: np.ndarray = card_indexes[np.frombuffer(raw_cards, dtype=np.uint8)].reshape(-1, 5)
+    bids: np.ndarray = np.array([bid for _cards, bid in hands], dtype=np.int64)
+
+    card_values: np.ndarray = np.array(
+        [(JOKER_CARD_VALUES if jokers else CARD_VALUES)[card] for card in CARD_ORDER], dtype=np.int64
+    )
+
+    # Same packing as get_hand_key
+    keys: np.ndarray = table[int(jokers)][digits @ CARD_WEIGHTS].astype(np.int64)
+    for col in range(5):
+        keys = (keys << 4) | card_values[digits[:, col]]
+
+    ranks: np.ndarray = np.arange(1, len(hands) + 1, dtype=np.int64)
+    return int((bids[np.argsort(keys, kind="stable")] * ranks).sum())
+
+
+def part_one(hands: List[Tuple[str, int]]) -> int:
+    return compute_winnings(hands)
+
+
+def part_two(hands: List[Tuple[str, int]]) -> int:
+    return compute_winnings(hands, jokers=True)
+
+
+if __name__ == "__main__":
+    hands: List[Tuple[str, int]] = []
+    with open("input.txt", mode="r") as f_input:
+        for line in f_input.readlines():
+            cards, _, bid = line.strip().partition(" ")
+            hands.append((cards, int(bid)))
+
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument("--table", action="store_true", help="Use the precomputed table of all hands")
+    args: argparse.Namespace = parser.parse_args()
+
+    if args.table:
+        table: np.ndarray = load_hand_type_table()
+        print("Part one:", compute_winnings_batch(hands, table))
+        print("Part two:", compute_winnings_batch(hands, table, jokers=True))
+    else:
+        print("Part one:", part_one(hands))
+        print("Part two:", part_two(hands))
@@ -1,91 +1,237 @@
+from array import array
+from dataclasses import dataclass
+from itertools import product
 from typing import *
 import math
 import re
 
 
 class Map:
-    """Represents the map."""
+    """Represents the map, nodes being interned to integer IDs."""
 
     parsing_regex: Pattern[str] = re.compile(r"(?P<loc>\w{3}) = \((?P<left>\w{3}), (?P<right>\w{3})\)")
 
-    directions: Dict[str, Tuple[str, str]]
+    names: List[str]
+    ids: Dict[str, int]
+
+    # Next node ID, by node ID
+    left: array
+    right: array
 
     def __init__(self) -> None:
-        self.directions = {}
+        self.names = []
+        self.ids = {}
+        self.left = array('I')
+        self.right = array('I')
+
+    def get_id(self, loc: str) -> int:
+        if loc not in self.ids:
+            self.ids[loc] = len(self.names)
+            self.names.append(loc)
+            self.left.append(0)
+            self.right.append(0)
+        return self.ids[loc]
 
     def register_line(self, line: str) -> None:
         match = self.parsing_regex.match(line)
         if match is None:
             raise RuntimeError(line)
-        self.directions[match.group("loc")] = (match.group("left"), match.group("right"))
-
-    def get_next(self, loc: str, direction: str) -> str:
-        if direction == "L":
-            return self.get_left(loc)
-        if direction == "R":
-            return self.get_right(loc)
-        raise NotImplementedError
+        loc_id: int = self.get_id(match.group("loc"))
+        self.left[loc_id] = self.get_id(match.group("left"))
+        self.right[loc_id] = self.get_id(match.group("right"))
+
+    def get_tables(self, pattern: str) -> List[array]:
+        """Return the table to use at each step of the pattern."""
+        tables: Dict[str, array] = {"L": self.left, "R": self.right}
+        if any(direction not in tables for direction in pattern):
+            raise ValueError(pattern)
+        return [tables[direction] for direction in pattern]
+
+
+@dataclass
+class GhostCycle:
+    """Steps at which a ghost is on an end node, found from its (node, pattern index) states."""
+    offset: int  # Steps before entering the cycle
+    period: int
+    transient_hits: List[int]  # Before the cycle, reached only once
+    cycle_hits: List[int]  # In the first cycle, reached again every period
+
+    def is_hit(self, step: int) -> bool:
+        if step in self.transient_hits:
+            return True
+        return any(hit <= step and (step - hit) % self.period == 0 for hit in self.cycle_hits)
+
+
+def find_cycle(tables: List[array], start: int, ends: Set[int]) -> GhostCycle:
+    pattern_length: int = len(tables)
+    seen: Dict[int, int] = {}  # State (node * pattern_length + pattern index) -> first step
+    hits: List[int] = []
+
+    step: int = 0
+    current: int = start
+    while (state := current * pattern_length + step % pattern_length) not in seen:
+        seen[state] = step
+        if current in ends:
+            hits.append(step)
+        current = tables[step % pattern_length][current]
+        step += 1
+
+    offset: int = seen[state]
+    return GhostCycle(
+        offset=offset,
+        period=step - offset,
+        transient_hits=[hit for hit in hits if hit < offset],
+        cycle_hits=[hit for hit in hits if offset <= hit],
+    )
+
+
+def combine_congruences(remainder_1: int, modulus_1: int, remainder_2: int, modulus_2: int) -> Optional[Tuple[int, int]]:
+    """Chinese remainder theorem, moduli not being necessarily coprime."""
+    gcd: int = math.gcd(modulus_1, modulus_2)
+    if (remainder_2 - remainder_1) % gcd != 0:
+        return None
+
+    reduced_modulus: int = modulus_2 // gcd
+    factor: int = (remainder_2 - remainder_1) // gcd * pow(modulus_1 // gcd, -1, reduced_modulus) % reduced_modulus
+
+    lcm: int = modulus_1 * reduced_modulus
+    return (remainder_1 + modulus_1 * factor) % lcm, lcm
+
+
+def first_common_hit(cycles: List[GhostCycle]) -> Optional[int]:
+    """Lowest step at which all ghosts are on an end node."""
+    candidates: List[int] = []
+
+    # Steps before some ghost enters its cycle
+    for step in sorted({hit for cycle in cycles for hit in cycle.transient_hits}):
+        if all(cycle.is_hit(step) for cycle in cycles):
+            candidates.append(step)
+            break
+
+    # Steps in all cycles, for each combination of hits
+    for combination in product(*(cycle.cycle_hits for cycle in cycles)):
+        congruence: Optional[Tuple[int, int]] = (0, 1)
+        for hit, cycle in zip(combination, cycles):
+            congruence = combine_congruences(*congruence, hit % cycle.period, cycle.period)
+            if congruence is None:
+                break
+        if congruence is None:
+            continue
+
+        # The step must be reached by every ghost
+        remainder, modulus = congruence
+        lowest: int = max(combination)
+        candidates.append(remainder + max(0, -((remainder - lowest) // modulus)) * modulus)
+
+    return min(candidates, default=None)
+
+
+class JumpTable:
+    """Where each node leads after whole pattern repetitions.
+
+    jumps[level][node] is the node reached after 2^level full patterns (binary lifting),
+    levels being computed when first needed.
+    """
+
+    tables: List[array]
+    jumps: List[array]
+
+    def __init__(self, tables: List[array]) -> None:
+        self.tables = tables
+
+        node_number: int = len(tables[0]) if tables else 0
+        after_pattern: array = array('I', range(node_number))
+        for table in tables:
+            after_pattern = array('I', (table[node] for node in after_pattern))
+        self.jumps = [after_pattern]
+
+    def get_jump(self, level: int) -> array:
+        while len(self.jumps) <= level:
+            previous: array = self.jumps[-1]
+            self.jumps.append(array('I', (previous[node] for node in previous)))
+        return self.jumps[level]
+
+    def get_position(self, start: int, steps: int) -> int:
+        """Node reached after any number of steps, in O(log(steps) + pattern length)."""
+        patterns, remainder = divmod(steps, len(self.tables))
+
+        node: int = start
+        level: int = 0
+        while patterns:
+            if patterns & 1:
+                node = self.get_jump(level)[node]
+            patterns >>= 1
+            level += 1
+
+        for table in self.tables[:remainder]:
+            node = table[node]
+        return node
+
+    def get_first_hits(self, ends: Set[int]) -> array:
+        """For each node, first step of the pattern on an end node when starting from it (-1 if none)."""
+        first_hits: array = array('i', [-1]) * len(self.jumps[0])
+        for start in range(len(first_hits)):
+            node: int = start
+            for step, table in enumerate(self.tables):
+                if node in ends:
+                    first_hits[start] = step
+                    break
+                node = table[node]
+        return first_hits
+
+    def count_steps_to(self, start: int, ends: Set[int]) -> int:
+        """Walk whole patterns at once until one goes through an end node."""
+        first_hits: array = self.get_first_hits(ends)
+        after_pattern: array = self.jumps[0]
 
-    def get_left(self, loc: str) -> str:
-        return self.directions[loc][0]
+        move_counter: int = 0
+        node: int = start
+        for _ in range(len(first_hits)):
+            if first_hits[node] != -1:
+                return move_counter + first_hits[node]
+            node = after_pattern[node]
+            move_counter += len(self.tables)
 
-    def get_right(self, loc: str) -> str:
-        return self.directions[loc][1]
+        # Pattern starts nodes are looping without any end node
+        raise RuntimeError("End never reached")
 
 
-def part_one() -> int:
+def read_map(path: str) -> Tuple[Map, str]:
     map: Map = Map()
-    pattern: str
 
-    with open("alt-input.txt", mode='r') as f_input:
+    with open(path, mode='r') as f_input:
         pattern = f_input.readline().strip()
         f_input.readline()  # Skip empty line
         for line in f_input.readlines():
             map.register_line(line.strip())
 
-    # Run through the map
-    start: str = "AAA"
-    end: str = "ZZZ"
-    pattern_length: int = len(pattern)
+    return map, pattern
 
-    move_counter: int = 0
-    current_pos: str = start
-    while current_pos != end:
-        current_pos = map.get_next(current_pos, pattern[move_counter % pattern_length])
-        move_counter += 1
 
-    return move_counter
+def part_one() -> int:
+    map, pattern = read_map("alt-input.txt")
+    jump_table: JumpTable = JumpTable(map.get_tables(pattern))
+
+    # Run through the map, one whole pattern at a time
+    return jump_table.count_steps_to(map.ids["AAA"], {map.ids["ZZZ"]})
 
 
 def part_two() -> int:
-    map: Map = Map()
-    pattern: str
+    map, pattern = read_map("alt-input.txt")
+    tables: List[array] = map.get_tables(pattern)
 
-    with open("alt-input.txt", mode='r') as f_input:
-        pattern = f_input.readline().strip()
-        f_input.readline()  # Skip empty line
-        for line in f_input.readlines():
-            map.register_line(line.strip())
+    starts: List[int] = [node for node, name in enumerate(map.names) if name.endswith("A")]
+    ends: Set[int] = {node for node, name in enumerate(map.names) if name.endswith("Z")}
 
-    # Run through the map
-    pattern_length: int = len(pattern)
-    starts: List[str] = [pos for pos in map.directions if pos.endswith("A")]
-
-    # VERY STRONG HYPOTHESIS HERE
-    # I assumed (wondering how to solve the problem but mostly how it was made)
-    # that all ghosts' paths were a loop (after the end position, the following position is the start).
-    # This allows a computation around solutions like "sol = k*x", with k being the length of the path.
-    # If the solutions were more general ("sol = k*x + delta"), it would have required significantly more math.
-    periodicity: List[int] = []
-    for start_pos in starts:
-        move_counter: int = 0
-        current_pos: str = start_pos
-        while not current_pos.endswith("Z"):
-            current_pos = map.get_next(current_pos, pattern[move_counter % pattern_length])
-            move_counter += 1
-        periodicity.append(move_counter)
+    # Each ghost's path ends in a cycle, possibly after a few steps and with several end nodes in it
+    cycles: List[GhostCycle] = [find_cycle(tables, start, ends) for start in starts]
+
+    result: Optional[int] = first_common_hit(cycles)
+    if result is None:
+        raise RuntimeError("Ghosts are never all on end nodes at the same time")
+    return result
 
-    return math.lcm(*periodicity)
 
-print("Part one:", part_one())
-print("Part two:", part_two())
+if __name__ == "__main__":
+    print("Part one:", part_one())
+    print("Part two:", part_two())
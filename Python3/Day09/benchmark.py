@@ -0,0 +1,44 @@
+"""Compare the batch extrapolation with History's pure Python one, on generated series of various lengths."""
+
+from typing import *
+import argparse
+import random
+import time
+
+from day9 import History, extrapolate_all, get_batch_dtype, get_next_weights
+
+
+def generate_histories(series_number: int, length: int, seed: int = 2023) -> List[History]:
+    """Generate series from random polynomials, like the puzzle input."""
+    rng: random.Random = random.Random(seed)
+    histories: List[History] = []
+    for _ in range(series_number):
+        coefficients: List[int] = [rng.randint(-10, 10) for _ in range(rng.randint(1, 8))]
+        values: List[int] = [sum(coef * x ** power for power, coef in enumerate(coefficients)) for x in range(length)]
+        histories.append(History(" ".join(str(value) for value in values)))
+    return histories
+
+
+def timed(name: str, function: Callable[[], int]) -> int:
+    start: float = time.perf_counter()
+    result: int = function()
+    print(f"  {name:<12} {time.perf_counter() - start:8.3f}s")
+    return result
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument("--series", type=int, default=5_000, help="Number of series per length")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[21, 50, 100, 200])
+    args: argparse.Namespace = parser.parse_args()
+
+    for length in args.lengths:
+        histories: List[History] = generate_histories(args.series, length)
+        dtype: type = get_batch_dtype([hist.history for hist in histories], get_next_weights(length))
+        print(f"== {args.series} series of length {length} ({dtype.__name__}) ==")
+
+        python_result: int = timed("python", lambda: sum(hist.extrapolate_next() for hist in histories))
+        batch_result: int = timed("batch", lambda: extrapolate_all(histories, get_next_weights))
+
+        if python_result != batch_result:
+            raise RuntimeError(f"Results disagree: {python_result} != {batch_result}")
@@ -1,83 +1,96 @@
+from collections import defaultdict
 from typing import *
+import functools
+import math
 
+import numpy as np
 
-class History:
-    """Represent the evolution on one value."""
 
-    history: List[int]
+@functools.cache
+def get_next_weights(length: int) -> Tuple[int, ...]:
+    """Signed binomial coefficients giving the next value of a history as a dot product.
 
-    def __init__(self, line: str) -> None:
-        self.history: List[int] = [int(x) for x in line.strip().split(" ")]
+    Differences are computed until they are all zeros, i.e. the history is extrapolated
+    by its polynomial of degree length - 1 (Newton forward differences):
+    next = sum((-1)^(length - 1 - i) * C(length, i) * history[i])
+    """
+    return tuple((-1) ** (length - 1 - idx) * math.comb(length, idx) for idx in range(length))
 
-        # self.extrapolate_next()
-        self.extrapolate_prev()
 
-    def get_first(self) -> int:
-        return self.history[0]
+@functools.cache
+def get_prev_weights(length: int) -> Tuple[int, ...]:
+    """Same as get_next_weights, extrapolating backwards.
 
-    def get_last(self) -> int:
-        return self.history[-1]
+    prev = sum((-1)^i * C(length, i + 1) * history[i])
+    """
+    return tuple((-1) ** idx * math.comb(length, idx + 1) for idx in range(length))
 
-    def extrapolate_next(self) -> None:
-        tmp: Dict[int, List[int]] = {
-            0: self.history
-        }
 
-        line_counter: int = 0
-        # Compute sub values
-        while not all(x == 0 for x in tmp[line_counter]):
+class History:
+    """Represent the evolution on one value."""
 
-            # pylint: disable=unsubscriptable-object  # Zip if not subscripted, it is the values given to it
-            it_list: zip[Tuple[int, int]] = zip(tmp[line_counter][:-1], tmp[line_counter][1:])
+    history: List[int]
+
+    def __init__(self, line: str) -> None:
+        self.history: List[int] = [int(x) for x in line.strip().split(" ")]
+
+    def extrapolate_next(self) -> int:
+        return sum(weight * value for weight, value in zip(get_next_weights(len(self.history)), self.history))
 
-            line_counter += 1
-            tmp[line_counter] = [y - x for x, y in it_list]
+    def extrapolate_prev(self) -> int:
+        return sum(weight * value for weight, value in zip(get_prev_weights(len(self.history)), self.history))
 
-        # Rebuild values
-        for idx in range(line_counter - 1, -1, -1):
-            value_to_add: int = tmp[idx][-1] + tmp[idx + 1][-1]
-            tmp[idx].append(value_to_add)
 
-        # for k, v in tmp.items():
-        #    print(f"({len(v):2}) {k}: {v}")
+INT64_MAX: int = int(np.iinfo(np.int64).max)
 
-    def extrapolate_prev(self) -> None:
-        tmp: Dict[int, List[int]] = {
-            0: self.history
-        }
 
-        line_counter: int = 0
-        # Compute sub values
-        while not all(x == 0 for x in tmp[line_counter]):
+def get_batch_dtype(values: List[List[int]], weights: Tuple[int, ...]) -> type:
+    """Use int64 only when no dot product (nor partial sum) can overflow, exact Python integers otherwise.
 
-            # pylint: disable=unsubscriptable-object  # Zip if not subscripted, it is the values given to it
-            it_list: zip[Tuple[int, int]] = zip(tmp[line_counter][:-1], tmp[line_counter][1:])
+    Each one is bounded by max(|value|) * sum(|weight|).
+    """
+    weights_sum: int = sum(abs(weight) for weight in weights)
+    if weights_sum > INT64_MAX:
+        return object
 
-            line_counter += 1
-            tmp[line_counter] = [y - x for x, y in it_list]
+    limit: int = INT64_MAX // max(weights_sum, 1)
+    if any(max(row) > limit or min(row) < -limit for row in values if row):
+        return object
+    return np.int64
 
-        # Rebuild values
-        for idx in range(line_counter - 1, -1, -1):
-            value_to_add: int = tmp[idx][0] - tmp[idx + 1][0]
-            tmp[idx].insert(0, value_to_add)
 
-        #for k, v in tmp.items():
-        #   print(f"({len(v):2}) {k}: {v}")
+def extrapolate_all(histories: List[History], get_weights: Callable[[int], Tuple[int, ...]]) -> int:
+    """Sum the extrapolated values, with one matrix-vector product per histories length."""
+    by_length: DefaultDict[int, List[List[int]]] = defaultdict(list)
+    for hist in histories:
+        by_length[len(hist.history)].append(hist.history)
 
+    result: int = 0
+    for length, values in by_length.items():
+        weights: Tuple[int, ...] = get_weights(length)
 
-histories: List[History] = []
-with open("input.txt", mode='r') as f_input:
-    for line in f_input.readlines():
-        histories.append(History(line))
+        if get_batch_dtype(values, weights) is np.int64:
+            matrix: np.ndarray = np.array(values, dtype=np.int64)
+            result += sum((matrix @ np.array(weights, dtype=np.int64)).tolist())
+        else:
+            # Object arrays would only add overhead to Python integers operations
+            result += sum(sum(weight * value for weight, value in zip(weights, row)) for row in values)
+    return result
 
 
 def part_one(histories: List[History]) -> int:
-    return sum(hist.get_last() for hist in histories)
+    return extrapolate_all(histories, get_next_weights)
 
 
 def part_two(histories: List[History]) -> int:
-    return sum(hist.get_first() for hist in histories)
+    return extrapolate_all(histories, get_prev_weights)
+
 
+if __name__ == "__main__":
+    histories: List[History] = []
+    with open("input.txt", mode='r') as f_input:
+        for line in f_input.readlines():
+            histories.append(History(line))
 
-#print("Part one:", part_one(histories))
-print("Part two:", part_two(histories))
+    print("Part one:", part_one(histories))
+    print("Part two:", part_two(histories))
@@ -0,0 +1,72 @@
+"""Time the loop tracing and the enclosed tiles count on synthetic pipe mazes."""
+
+from typing import *
+import argparse
+import random
+import time
+
+from day10 import GridMap, compute_loop, count_enclosed_tiles, count_enclosed_tiles_parity
+
+
+def generate_snake_lines(size: int) -> List[str]:
+    """Generate a size x size maze whose loop snakes through the whole grid (size must be even).
+
+    Rows are walked from left to right and back, the loop coming back to the start through the first column.
+    """
+    if size % 2 or size < 4:
+        raise ValueError("Size must be even, at least 4")
+
+    middle: str = "-" * (size - 3)
+    lines: List[str] = ["S" + "-" * (size - 2) + "7"]
+    for row in range(1, size - 1):
+        if row % 2:
+            lines.append("|F" + middle + "J")
+        else:
+            lines.append("|L" + middle + "7")
+    lines.append("L-" + middle + "J")
+    return lines
+
+
+def generate_ring_lines(size: int, seed: int = 2023) -> List[str]:
+    """Generate a size x size maze whose loop follows the border, enclosing (size - 2)^2 tiles.
+
+    The inside is filled with ground and stray pipes, not being part of the loop.
+    """
+    if size < 3:
+        raise ValueError("Size must be at least 3")
+
+    rng: random.Random = random.Random(seed)
+    lines: List[str] = ["S" + "-" * (size - 2) + "7"]
+    for _ in range(size - 2):
+        lines.append("|" + "".join(rng.choices(".|-LJ7F", k=size - 2)) + "|")
+    lines.append("L" + "-" * (size - 2) + "J")
+    return lines
+
+
+def timed(name: str, function: Callable[[], Any]) -> Any:
+    start: float = time.perf_counter()
+    result: Any = function()
+    print(f"{name:<12} {time.perf_counter() - start:8.3f}s")
+    return result
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=5_000, help="Maze side length")
+    args: argparse.Namespace = parser.parse_args()
+
+    mazes: Dict[str, List[str]] = {
+        "snake": generate_snake_lines(args.size),
+        "ring": generate_ring_lines(args.size),
+    }
+
+    for name, lines in mazes.items():
+        print(f"== {name} ==")
+        map: GridMap = timed("load", lambda: GridMap(lines))
+        loop = timed("loop", lambda: compute_loop(map))
+        enclosed: int = timed("shoelace", lambda: count_enclosed_tiles(map, loop))
+        parity_enclosed: int = timed("parity", lambda: count_enclosed_tiles_parity(map, loop))
+
+        if enclosed != parity_enclosed:
+            raise RuntimeError(f"Backends disagree: {enclosed} != {parity_enclosed}")
+        print(f"Loop length: {len(loop):,}, enclosed tiles: {enclosed:,}")
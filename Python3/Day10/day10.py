@@ -1,51 +1,20 @@
+from array import array
 from enum import Enum
+from itertools import combinations
 from typing import *
+import argparse
 
-from tqdm import tqdm
+import numpy as np
 
 
-class Coordinate:
-    row: int
-    col: int
+# Connections of a cell, as a 4-bit mask
+NORTH: int = 1
+EAST: int = 2
+SOUTH: int = 4
+WEST: int = 8
 
-    def __init__(self, row: int, col: int) -> None:
-        self.row = row
-        self.col = col
-
-    def get_direction_to_coordinate(self, coord: 'Coordinate') -> 'Direction':
-        delta_row: int = coord.row - self.row
-        delta_col: int = coord.col - self.col
-        return Direction((delta_row, delta_col))
-
-    def __eq__(self, other: object) -> bool:
-        if not isinstance(other, Coordinate):
-            return NotImplemented
-        return self.row == other.row and self.col == other.col
-
-    def __add__(self, other: Any) -> 'Coordinate':
-        if isinstance(other, Coordinate):
-            return Coordinate(self.row + other.row, self.col + other.col)
-        if isinstance(other, Direction):
-            return Coordinate(self.row + other.value[0], self.col + other.value[1])
-        raise NotImplementedError
-
-    def __repr__(self) -> str:
-        return f"({self.row}, {self.col})"
-
-
-class Direction(Enum):
-    UPPER_LEFT =    (-1, -1)
-    UPPER =         (-1, +0)
-    UPPER_RIGHT =   (-1, +1)
-    LEFT =          (+0, -1)
-    RIGHT =         (+0, +1)
-    LOWER_LEFT =    (+1, -1)
-    LOWER =         (+1, +0)
-    LOWER_RIGHT =   (+1, +1)
-
-    @classmethod
-    def get_direct_directions(cls) -> List['Direction']:
-        return [Direction.UPPER, Direction.RIGHT, Direction.LOWER, Direction.LEFT]
+DIRECTIONS: List[int] = [NORTH, EAST, SOUTH, WEST]
+OPPOSITES: Dict[int, int] = {NORTH: SOUTH, EAST: WEST, SOUTH: NORTH, WEST: EAST}
 
 
 class Pipe(Enum):
@@ -59,178 +28,138 @@ class Pipe(Enum):
     DOWN_RIGHT = "F"
     DOWN_LEFT = "7"
 
-    def is_pipe(self) -> bool:
-        return self is not Pipe.NONE
 
-    def is_start(self) -> bool:
-        return self is Pipe.START
+PIPES_CONNECTIONS: Dict[Pipe, int] = {
+    Pipe.NONE:          0,
+    Pipe.START:         0,  # Deduced from its neighbours
+    Pipe.VERTICAL:      NORTH | SOUTH,
+    Pipe.HORIZONTAL:    EAST | WEST,
+    Pipe.UP_LEFT:       NORTH | WEST,
+    Pipe.UP_RIGHT:      NORTH | EAST,
+    Pipe.DOWN_RIGHT:    SOUTH | EAST,
+    Pipe.DOWN_LEFT:     SOUTH | WEST,
+}
 
-    def is_left(self) -> bool:
-        return self in [Pipe.UP_LEFT, Pipe.DOWN_LEFT]
+# Translation table from a character to its connections mask
+CONNECTIONS_TABLE: bytearray = bytearray(256)
+for pipe, connections in PIPES_CONNECTIONS.items():
+    CONNECTIONS_TABLE[ord(pipe.value)] = connections
 
-    def is_right(self) -> bool:
-        return self in [Pipe.UP_RIGHT, Pipe.DOWN_RIGHT]
 
-    def is_corner(self) -> bool:
-        return self in [Pipe.UP_LEFT, Pipe.UP_RIGHT, Pipe.DOWN_LEFT, Pipe.DOWN_RIGHT]
+class GridMap:
+    """Represent the pipes map, as a flat array of connections masks.
 
-    def is_vertical_pipe(self) -> bool:
-        return self is not Pipe.NONE and self is not Pipe.START and self is not Pipe.HORIZONTAL
+    The grid is surrounded by a border of ground, so that neighbours are always
+    at a constant index offset (+-1 horizontally, +-width vertically).
+    """
 
-    def get_vertical_direction(self) -> str:
-        if self in [Pipe.UP_LEFT, Pipe.UP_RIGHT]:
-            return "UP"
-        if self in [Pipe.DOWN_LEFT, Pipe.DOWN_RIGHT]:
-            return "DOWN"
-        return ""
+    max_row: int
+    max_col: int
+    width: int  # Padded row length
 
+    cells: bytearray
+    start: int
+    steps: Dict[int, int]  # Index offset, by direction
 
-PIPES_LINKABLE_DIRECTION: Dict[Pipe, List[Direction]] = {
-    Pipe.NONE: [],
-    Pipe.START:         list(Direction),
-    Pipe.VERTICAL:      [Direction.UPPER, Direction.LOWER],
-    Pipe.HORIZONTAL:    [Direction.LEFT, Direction.RIGHT],
-    Pipe.UP_LEFT:       [Direction.UPPER, Direction.LEFT],
-    Pipe.UP_RIGHT:      [Direction.UPPER, Direction.RIGHT],
-    Pipe.DOWN_RIGHT:    [Direction.LOWER, Direction.RIGHT],
-    Pipe.DOWN_LEFT:     [Direction.LOWER, Direction.LEFT],
-}
+    def __init__(self, lines: List[str]) -> None:
+        stripped_lines: List[str] = [line.strip() for line in lines]
+        self.max_row = len(stripped_lines)
+        self.max_col = len(stripped_lines[0])
+        self.width = self.max_col + 2
+
+        border: str = Pipe.NONE.value * self.width
+        padded: str = "".join([border] + [f".{line}." for line in stripped_lines] + [border])
+
+        self.start = padded.index(Pipe.START.value)
+        self.cells = bytearray(padded.encode().translate(CONNECTIONS_TABLE))
+        self.steps = {NORTH: -self.width, EAST: 1, SOUTH: self.width, WEST: -1}
+
+        self.cells[self.start] = self.get_start_connections()
+
+    def get_start_connections(self) -> int:
+        """The start may connect to any neighbour connecting to it, the loop only goes through two of them."""
+        return sum(
+            direction
+            for direction in DIRECTIONS
+            if self.cells[self.start + self.steps[direction]] & OPPOSITES[direction]
+        )
+
+    def get_coordinates(self, index: int) -> Tuple[int, int]:
+        """Row and column in the original map."""
+        row, col = divmod(index, self.width)
+        return row - 1, col - 1
+
+
+def walk_loop(map: GridMap, first: int, second: int) -> Optional[array]:
+    """Leave the start through `first`, return the loop tiles if it comes back through `second`."""
+    cells: bytearray = map.cells
+    steps: Dict[int, int] = map.steps
+
+    direction: int = first
+    index: int = map.start
+    loop: array = array('I', [index])
+
+    while True:
+        index += steps[direction]
+        coming_from: int = OPPOSITES[direction]
+        if index == map.start:
+            return loop if coming_from == second else None
+
+        # Leave the pipe through its other end
+        if not cells[index] & coming_from:
+            return None  # Broken path
+        direction = cells[index] ^ coming_from
+        loop.append(index)
+
+
+def compute_loop(map: GridMap) -> array:
+    """Return the flat indexes of the loop tiles, starting from the start.
+
+    The start's connections are reduced to the two ones actually used by the loop.
+    """
+    candidates: List[int] = [direction for direction in DIRECTIONS if map.cells[map.start] & direction]
+
+    for first, second in combinations(candidates, 2):
+        loop: Optional[array] = walk_loop(map, first, second)
+        if loop is not None:
+            map.cells[map.start] = first | second
+            return loop
 
+    raise ValueError(f"No loop going through the start at {map.get_coordinates(map.start)}")
 
-class GridMap:
-    """Represent the pipes map."""
 
-    lines: List[str]
-    max_row: int
-    max_col: int
+def count_enclosed_tiles(map: GridMap, loop: array) -> int:
+    """Count tiles enclosed by the loop, in O(loop length).
 
-    start_coordinates: Optional[Coordinate]
+    The shoelace formula gives the area A of the polygon whose vertices are the loop tiles centers.
+    Its boundary points are the b loop tiles, so Pick's theorem (A = i + b/2 - 1) gives the i inner tiles.
+    """
+    double_area: int = 0
+    previous_row, previous_col = divmod(loop[-1], map.width)  # Close the loop
+    for index in loop:
+        row, col = divmod(index, map.width)
+        double_area += previous_row * col - row * previous_col
+        previous_row, previous_col = row, col
 
-    def __init__(self, lines: List[str]) -> None:
-        self.lines = [line.strip() for line in lines]
-        self.max_row = len(self.lines)
-        self.max_col = len(self.lines[0])
-        self.start_coordinates = None
-
-    def get_adjacent_linkable_pipes_coordinates(self, coord: Coordinate) -> List[Coordinate]:
-        pipe: Pipe = Pipe(self.get_pipe(coord))
-
-        result: List[Coordinate] = []
-        for ajd_pip_coord in self.get_adjacent_pipe_coordinates(coord):
-            delta_dir: Direction = coord.get_direction_to_coordinate(ajd_pip_coord)
-            if delta_dir in PIPES_LINKABLE_DIRECTION[pipe]:
-                result.append(ajd_pip_coord)
-
-        if pipe is not Pipe.START and len(result) != 2:
-            raise RuntimeError(f"More than 2 linkable pipes: {coord}")
-        return result
-
-    def get_adjacent_pipe_coordinates(self, coord: Coordinate) -> List[Coordinate]:
-        return [
-            coord
-            for coord in self.get_adjacent_coordinates(coord)
-            if self.get_pipe(coord).is_pipe()
-        ]
-
-    def get_adjacent_coordinates(self, coord: Coordinate) -> List[Coordinate]:
-        full_list: List[Coordinate] = [coord + dir for dir in Direction.get_direct_directions()]
-        return [coord for coord in full_list if self.get_pipe(coord) is not None]
-
-    def get_pipe(self, coord: Coordinate) -> Pipe:
-        # pylint: disable=superfluous-parens
-        if not (0 <= coord.row < self.max_row) or not (0 <= coord.col < self.max_col):
-            return Pipe.NONE
-        return Pipe(self.lines[coord.row][coord.col])
-
-    def get_start_coordinate(self) -> Coordinate:
-        if self.start_coordinates is not None:
-            return self.start_coordinates
-
-        for row_idx, row in enumerate(self.lines):
-            for col_idx, _col in enumerate(row):
-                coord: Coordinate = Coordinate(row_idx, col_idx)
-                if self.get_pipe(coord) is Pipe.START:
-                    self.start_coordinates = coord
-                    return coord
-        raise RuntimeError("No start found.")
-
-    def extrapolate_start_pipe(self) -> None:
-        start_coord: Coordinate = self.get_start_coordinate()
-        all_adj_coords: List[Coordinate] = self.get_adjacent_linkable_pipes_coordinates(start_coord)
-
-        adj_coords: List[Coordinate] = [
-            coord
-            for coord in all_adj_coords
-            if coord.get_direction_to_coordinate(start_coord) in PIPES_LINKABLE_DIRECTION[self.get_pipe(coord)]
-        ]
-        adj_directions: List[Direction] = [start_coord.get_direction_to_coordinate(adj) for adj in adj_coords]
-
-        for pipe, directions in PIPES_LINKABLE_DIRECTION.items():
-            if set(directions) == set(adj_directions):
-                print(f"> Chose pipe {pipe} for start")
-                row: int = start_coord.row
-                col: int = start_coord.col
-                original_line: str = self.lines[row]
-                new_line: str = original_line[:col] + pipe.value + original_line[col+1:]
-                self.lines[row] = new_line
-                break
-        else:
-            raise RuntimeError("Unable to find a starting pipe")
-
-    def print_map(self) -> None:
-        for line in self.lines:
-            print(f"{line}")
-
-
-def compute_loop(map: GridMap) -> List[Coordinate]:
-    loop: List[Coordinate] = []
-    start_coord: Coordinate = map.get_start_coordinate()
-
-    # Attempt to find a loop, starting in all four directions
-    for dir in Direction.get_direct_directions():
-        loop = []  # Reset a potential previous attempt
-
-        previous_coord: Coordinate = start_coord
-        current_coord: Coordinate = start_coord + dir
-
-        loop.append(start_coord)
-        loop.append(current_coord)
-
-        if not map.get_pipe(current_coord).is_pipe():
-            # Ignore ground around the start
-            continue
-
-        if not current_coord.get_direction_to_coordinate(previous_coord) in PIPES_LINKABLE_DIRECTION[map.get_pipe(current_coord)]:
-            # Ignore impossible starts
-            continue
-
-        print(f"Attempting {dir.name} from start")
-        try:
-            while not map.get_pipe(current_coord).is_start():
-                ajd_pipe_coordinates: List[Coordinate] = map.get_adjacent_linkable_pipes_coordinates(current_coord)
-                # Must be length == 2
-
-                option_1: Coordinate = ajd_pipe_coordinates[0]
-                option_2: Coordinate = ajd_pipe_coordinates[1]
-                new_current_coord: Coordinate
-                if option_1 == previous_coord:
-                    new_current_coord = option_2
-                else:
-                    new_current_coord = option_1
-
-                # Step once
-                previous_coord = current_coord
-                current_coord = new_current_coord
-                loop.append(current_coord)
-
-            # Current coord is the start
-            return loop
+    return (abs(double_area) - len(loop)) // 2 + 1
+
+
+def count_enclosed_tiles_parity(map: GridMap, loop: array) -> int:
+    """Count tiles enclosed by the loop, scanning each row with array operations.
+
+    Going along a row, crossing a loop tile connected to the north ("|", "L", "J")
+    switches between outside and inside (a "F-J" turn crosses the loop once, a "L-J" turn does not).
+    """
+    cells: np.ndarray = np.frombuffer(map.cells, dtype=np.uint8).reshape(-1, map.width)
 
-        except RuntimeError:
-            # It might not be the right way, try another one
-            print("Error")
-            continue
-    raise RuntimeError("Unable to loop")
+    on_loop: np.ndarray = np.zeros(cells.size, dtype=bool)
+    on_loop[np.frombuffer(loop, dtype=np.dtype(loop.typecode))] = True
+    on_loop = on_loop.reshape(cells.shape)
+
+    # Only the parity matters, uint8 overflows do not change it
+    crossings: np.ndarray = np.cumsum(on_loop & (cells & NORTH != 0), axis=1, dtype=np.uint8)
+    inside: np.ndarray = (crossings & 1).astype(bool) & ~on_loop
+    return int(inside.sum())
 
 
 def part_one() -> int:
@@ -240,83 +169,27 @@ def part_one() -> int:
     with open("input.txt", mode='r') as f_input:
         map = GridMap(f_input.readlines())
 
-    loop: List[Coordinate] = compute_loop(map)
+    loop: array = compute_loop(map)
     return len(loop) // 2
 
 
-def part_two() -> int:
-    base_map: GridMap
-    loop_map: GridMap
+def part_two(parity: bool = False) -> int:
+    map: GridMap
 
     # Load map from file
     with open("input.txt", mode='r') as f_input:
-        lines: List[str] = list(f_input.readlines())
-        base_map = GridMap(lines)
-        loop_map = GridMap(lines)
-
-    # Compute loop
-    loop: List[Coordinate] = compute_loop(base_map)
-
-    # Transform the loop map, replace every non loop pipe by ground
-    for row in tqdm(range(base_map.max_row), desc="Erasing non-loop pipes", unit="line"):
-        for col in range(base_map.max_col):  # This is terribly not optimized
-            # Removing pipes out of the loop
-            # Also removing horizontal pipes since we will be counting pipes on each line, line by line
-            if Coordinate(row, col) not in loop: # or loop_map.get_pipe(Coordinate(row, col)) is Pipe.HORIZONTAL:
-                original_line: str = loop_map.lines[row]
-                new_line: str = original_line[:col] + Pipe.NONE.value + original_line[col+1:]
-                loop_map.lines[row] = new_line
-
-    loop_map.extrapolate_start_pipe()
-    # loop_map.print_map()
-
-    # Write loop to another file for debug (and quicker recovery)
-    if False:
-        with open("input-loop.txt", mode='w+') as f_loop:
-            f_loop.writelines(f"{line}\n" for line in loop_map.lines)
-
-    # Determine in/out on each line
-    counter: int = 0
-
-    is_in: bool = False
-    vert_dir: str = ""
-    for row, line in enumerate(loop_map.lines):
-        is_in = False
-
-        for col, pipe_str in enumerate(line):
-            pipe: Pipe = Pipe(pipe_str)
-
-            # Inside None: count it
-            if pipe is Pipe.NONE and is_in is True:
-                counter += 1
-                continue
-            # Outside None: ignore it
-            if pipe is Pipe.NONE and is_in is False:
-                continue
-            # Vertical pipes: always changes in/out state
-            if pipe is Pipe.VERTICAL:
-                is_in = not is_in
-            # Horizontal and right pipes: does not change in/out state
-            if pipe is Pipe.HORIZONTAL:
-                continue
-            # If is_left, we remember the vertical direction
-            if pipe.is_right():
-                vert_dir = pipe.get_vertical_direction()
-                continue
-            # If is_left, we are crossing a new border and maybe changing in/out state
-            if pipe.is_left():
-                new_vert_dir = pipe.get_vertical_direction()
-
-                if vert_dir != new_vert_dir:
-                    # Not coming back where it comes from, changing in/out state
-                    is_in = not is_in
-
-                vert_dir = ""
-                continue
-        print("Line n°", row, line, "score=", counter)
-
-    return counter
-
-
-print("Part one:", part_one())
-print("Part two:", part_two())
+        map = GridMap(f_input.readlines())
+
+    loop: array = compute_loop(map)
+    if parity:
+        return count_enclosed_tiles_parity(map, loop)
+    return count_enclosed_tiles(map, loop)
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument("--parity", action="store_true", help="Count enclosed tiles with row scans")
+    args: argparse.Namespace = parser.parse_args()
+
+    print("Part one:", part_one())
+    print("Part two:", part_two(args.parity))
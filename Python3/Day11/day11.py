@@ -1,6 +1,9 @@
 from enum import Enum
+from itertools import accumulate
 from typing import *
 
+import numpy as np
+
 
 class SpaceItem(Enum):
     VOID = "."
@@ -42,7 +45,9 @@ class Space:
     space_rows: List[SpaceLine]
     space_cols: List[SpaceLine]
 
-    expansion_factor: int = 1
+    # The distances sum is linear in the expansion factor: base_distance + (factor - 1) * empty_crossings
+    base_distance: int  # Sum of distances without expansion
+    empty_crossings: int  # Number of empty lines crossed, summed over all pairs
 
     def __init__(self, lines: List[str]) -> None:
         self.raw_map = [line.strip() for line in lines]
@@ -55,36 +60,64 @@ class Space:
         row_is_empty: List[bool] = [True] * self.max_row
         col_is_empty: List[bool] = [True] * self.max_col
 
-        for row in range(self.max_row):
-            for col in range(self.max_col):
-                if SpaceItem(self.raw_map[row][col]) is SpaceItem.GALAXY:
-                    self.galaxies.append(Galaxy(row, col))
-                    row_is_empty[row] = False
-                    col_is_empty[col] = False
+        for row, line in enumerate(self.raw_map):
+            col: int = line.find(SpaceItem.GALAXY.value)
+            while col != -1:
+                self.galaxies.append(Galaxy(row, col))
+                row_is_empty[row] = False
+                col_is_empty[col] = False
+                col = line.find(SpaceItem.GALAXY.value, col + 1)
         self.space_rows = [SpaceLine(emptyness) for emptyness in row_is_empty]
         self.space_cols = [SpaceLine(emptyness) for emptyness in col_is_empty]
 
-    def compute_distance_between(self, gal1: Galaxy, gal2: Galaxy) -> int:
-        distance: int = 0
+        self.compute_distance_coefficients()
+
+    def compute_distance_coefficients(self) -> None:
+        """Manhattan distances are sums of distances on each axis, computed independently.
+
+        A line position once expanded is index + (factor - 1) * (empty lines before it).
+        Both terms increase with the index, so pairs distances split the same way.
+        """
+        self.base_distance = 0
+        self.empty_crossings = 0
+
+        for space_lines, positions in [
+            (self.space_rows, sorted(gal.x for gal in self.galaxies)),
+            (self.space_cols, sorted(gal.y for gal in self.galaxies)),
+        ]:
+            empty_before: List[int] = list(accumulate((line.is_empty for line in space_lines), initial=0))
+            self.base_distance += sum_pairwise_distances(positions)
+            self.empty_crossings += sum_pairwise_distances([empty_before[pos] for pos in positions])
+
+    def compute_all_distances_sum(self, expansion_factor: int) -> int:
+        return self.base_distance + (expansion_factor - 1) * self.empty_crossings
+
+    def compute_all_distances_sums(self, expansion_factors: Sequence[int]) -> np.ndarray:
+        """Answer many expansion factors at once.
+
+        Uses int64 when results cannot overflow, exact Python integers (object array) otherwise.
+        """
+        factors: np.ndarray = np.asarray(expansion_factors, dtype=object)
+        # Bounds |factor| and |factor - 1|
+        max_factor: int = max((abs(factor) + 1 for factor in factors.tolist()), default=0)
 
-        min_x: int = min(gal1.x, gal2.x)
-        max_x: int = max(gal1.x, gal2.x)
-        min_y: int = min(gal1.y, gal2.y)
-        max_y: int = max(gal1.y, gal2.y)
+        int64_max: int = np.iinfo(np.int64).max
+        if max_factor <= int64_max and self.base_distance + max_factor * self.empty_crossings <= int64_max:
+            factors = factors.astype(np.int64)
+        return self.base_distance + (factors - 1) * self.empty_crossings
 
-        for x in range(min_x, max_x):
-            distance += self.expansion_factor if self.space_rows[x].is_empty else 1
-        for y in range(min_y, max_y):
-            distance += self.expansion_factor if self.space_cols[y].is_empty else 1
 
-        return distance
+def sum_pairwise_distances(positions: List[int]) -> int:
+    """Sum of the distances between all pairs of sorted positions, in one pass.
 
-    def compute_all_distances_sum(self) -> int:
-        result: int = 0
-        for i, gal_i in enumerate(self.galaxies):
-            for _j, gal_j in enumerate(self.galaxies[i+1:]):
-                result += self.compute_distance_between(gal_i, gal_j)
-        return result
+    Each position is at distance (position - previous) of every previous one.
+    """
+    result: int = 0
+    running_sum: int = 0
+    for idx, position in enumerate(positions):
+        result += idx * position - running_sum
+        running_sum += position
+    return result
 
 
 space: Space
@@ -93,13 +126,11 @@ with open("input.txt", mode='r') as f_input:
 
 
 def part_one(space: Space) -> int:
-    space.expansion_factor = 2
-    return space.compute_all_distances_sum()
+    return space.compute_all_distances_sum(2)
 
 
 def part_two(space: Space) -> int:
-    space.expansion_factor = 1_000_000
-    return space.compute_all_distances_sum()
+    return space.compute_all_distances_sum(1_000_000)
 
 
 print("Part one:", part_one(space))
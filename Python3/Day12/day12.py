@@ -1,6 +1,5 @@
 from enum import Enum
 from typing import *
-import functools
 
 from tqdm import tqdm
 
@@ -146,62 +145,46 @@ def part_one() -> int:
 
 # ==== Part two ====
 
-@functools.cache
-def count_possible_values(springs: str, expected: Tuple[int, ...], current_group_length: int = 0) -> int:
+def count_possible_values(springs: str, expected: Tuple[int, ...]) -> int:
 	"""Compute the number of possible value of given springs corresponding to expected values.
 
-	Based on the idea that we know each time how to solve the smaller problem.
-	We only have to determine how to use this result while "adding" one spring to it.
+	Bottom-up dynamic programming, groups being placed from the last one to the first one.
+	For the current group, ways[i] is the number of arrangements of springs[i:] with the remaining groups:
+	- springs[i] is operational (if it can be), ways[i] += ways[i + 1]
+	- the group starts at i (if it fits), ways[i] += next group's ways[i + length + 1]
 
-	Using cache to gain execution performances. Prevents having to re-compute the same thing multiple times.
-	Using tuple instead of list becuase functools.cache require hasable types.
-	
-	Inspired by Allan Taylor's solution
-	https://github.com/AllanTaylor314/AdventOfCode/blob/main/2023/12.py
+	O(len(springs) * len(expected)) time, only two rows of ways kept in memory, no recursion.
 	"""
-	#print("[REC]", springs, expected, current_group_length)
-
-	# Stop condition
-	if not springs:
-		if len(expected) > 1:
-			# Unable to compute enough groups
-			return 0
-		if current_group_length != (expected[0] if expected else 0):
-			# Unable to compute a long enough last group
-			return 0
-		return 1 
-
-	current_spring: Spring = Spring(springs[0])
-	remaining_springs: str = springs[1:]
-
-	current_group_expected_length: int = expected[0] if expected else 0
-	remaining_expected: Tuple[int, ...] = expected[1:]
-
-	# Compute solution depending on small problems' solution
-	if current_spring is Spring.UNKNOWN:  # ?
-		# Create two smaller problems
-		return (
-			count_possible_values(Spring.DAMAGED.value + remaining_springs, expected, current_group_length) +
-			count_possible_values(Spring.OPERATIONAL.value + remaining_springs, expected, current_group_length)
-		)
-
-	if current_spring is Spring.OPERATIONAL:  # .
-		# If an expected group if finished, compute for smaller problem
-		if current_group_expected_length == current_group_length:
-			return count_possible_values(remaining_springs, remaining_expected)
-		# If between two groups, compute for smaller problem
-		if 0 == current_group_length:
-			return count_possible_values(remaining_springs, expected)
-		# Current group length is compatible with a solution
-		return 0
-
-	if current_spring is Spring.DAMAGED:
-		# If we are about to create a too long group
-		if current_group_length == current_group_expected_length:
-			return 0
-		return count_possible_values(remaining_springs, expected, current_group_length + 1)
-
-	raise ValueError("Found unexpected spring value")
+	length: int = len(springs)
+
+	# Number of consecutive possibly damaged springs starting at each index
+	run_lengths: List[int] = [0] * (length + 1)
+	for idx in range(length - 1, -1, -1):
+		if springs[idx] != Spring.OPERATIONAL.value:
+			run_lengths[idx] = run_lengths[idx + 1] + 1
+
+	# Without any group left, the remaining springs must not contain any damaged one
+	ways: List[int] = [0] * (length + 2)
+	ways[length] = 1
+	for idx in range(length - 1, -1, -1):
+		if springs[idx] == Spring.DAMAGED.value:
+			break
+		ways[idx] = 1
+
+	for group_length in reversed(expected):
+		next_ways: List[int] = ways
+		ways = [0] * (length + 2)
+
+		for idx in range(length - group_length, -1, -1):
+			if springs[idx] != Spring.DAMAGED.value:
+				ways[idx] = ways[idx + 1]
+
+			# A group of damaged springs fits at idx, followed by an operational one (or the end)
+			end: int = idx + group_length
+			if run_lengths[idx] >= group_length and (end == length or springs[end] != Spring.DAMAGED.value):
+				ways[idx] += next_ways[min(end + 1, length)]
+
+	return ways[0]
 
 
 def part_two() -> int: